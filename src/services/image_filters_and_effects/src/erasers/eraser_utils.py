@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import math
+
 import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFilter
@@ -7,130 +9,182 @@ from PIL import Image, ImageDraw, ImageFilter
 from ...models.effects_models import EraseShape, EraseShapeType
 
 
-def create_eraser_mask(image: Image.Image, shape: EraseShape) -> Image.Image:
+def shape_bbox(shape: EraseShape, width: int, height: int) -> tuple[int, int, int, int] | None:
+    """Return the clamped, padded bounding box of a localized shape.
+
+    Rect/circle/polygon/brush shapes only touch a small region of the
+    canvas, so masking and blending can run on the crop alone. Smart
+    (color-based) shapes can match anywhere and return None, meaning the
+    caller must process the full canvas.
+
+    Args:
+        shape: The eraser shape configuration
+        width: Canvas width in pixels
+        height: Canvas height in pixels
+
+    Returns:
+        (x0, y0, x1, y1) in canvas coordinates, or None for full-canvas shapes
+    """
+    # GaussianBlur's effective support is ~3 sigma; padding with only
+    # 1 sigma truncates the feather at the crop edge
+    pad = math.ceil(3 * shape.blur_radius) if shape.blur else 0
+
+    if shape.type == EraseShapeType.rectangle and shape.width and shape.height:
+        box = (shape.x, shape.y, shape.x + shape.width, shape.y + shape.height)
+    elif shape.type == EraseShapeType.circle and shape.radius:
+        box = (shape.x - shape.radius, shape.y - shape.radius,
+               shape.x + shape.radius, shape.y + shape.radius)
+    elif shape.type == EraseShapeType.polygon and shape.polygon_points and len(shape.polygon_points) >= 3:
+        xs = [p[0] for p in shape.polygon_points]
+        ys = [p[1] for p in shape.polygon_points]
+        box = (min(xs), min(ys), max(xs), max(ys))
+    elif shape.type == EraseShapeType.brush and shape.brush_points and len(shape.brush_points) > 1:
+        brush_size = shape.brush_size or 20
+        hardness = shape.brush_hardness or 0.5
+        # Round tip plus the hardness feather both spill past the
+        # stroke; the feather is a Gaussian too, so 3x its sigma
+        pad += brush_size // 2 + 1 + math.ceil(3 * brush_size * (1.0 - hardness) * 0.5)
+        xs = [p[0] for p in shape.brush_points]
+        ys = [p[1] for p in shape.brush_points]
+        box = (min(xs), min(ys), max(xs), max(ys))
+    else:
+        return None
+
+    x0 = max(0, math.floor(box[0]) - pad)
+    y0 = max(0, math.floor(box[1]) - pad)
+    x1 = min(width, math.ceil(box[2]) + pad)
+    y1 = min(height, math.ceil(box[3]) + pad)
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return x0, y0, x1, y1
+
+
+def create_eraser_mask(image: np.ndarray, shape: EraseShape, origin: tuple[int, int] = (0, 0)) -> np.ndarray:
     """
     Create an eraser mask based on the specified shape.
-    
+
     Args:
-        image: The source image
+        image: The source image (or crop) as an RGBA uint8 array
         shape: The eraser shape configuration
-        
+        origin: Canvas coordinates of the image's top-left corner, used to
+            translate shape coordinates when masking a crop
+
     Returns:
-        A mask image (mode 'L') where white (255) represents areas to erase
+        A uint8 (H, W) mask array where white (255) represents areas to erase
     """
-    mask = Image.new("L", image.size, 0)
+    height, width = image.shape[:2]
+    ox, oy = origin
+    mask = Image.new("L", (width, height), 0)
     mdraw = ImageDraw.Draw(mask)
-    
+    mask_arr = None
+
     if shape.type == EraseShapeType.rectangle and shape.width and shape.height:
-        mdraw.rectangle([shape.x, shape.y, shape.x + shape.width, shape.y + shape.height], fill=255)
-    
+        mdraw.rectangle([shape.x - ox, shape.y - oy, shape.x - ox + shape.width, shape.y - oy + shape.height], fill=255)
+
     elif shape.type == EraseShapeType.circle and shape.radius:
         mdraw.ellipse([
-            shape.x - shape.radius, shape.y - shape.radius,
-            shape.x + shape.radius, shape.y + shape.radius
+            shape.x - ox - shape.radius, shape.y - oy - shape.radius,
+            shape.x - ox + shape.radius, shape.y - oy + shape.radius
         ], fill=255)
-    
+
     elif shape.type == EraseShapeType.polygon and shape.polygon_points:
         if len(shape.polygon_points) >= 3:
-            mdraw.polygon(shape.polygon_points, fill=255)
-    
+            mdraw.polygon([(p[0] - ox, p[1] - oy) for p in shape.polygon_points], fill=255)
+
     elif shape.type == EraseShapeType.brush and shape.brush_points:
         # Draw brush stroke from points
         if len(shape.brush_points) > 1:
             brush_size = shape.brush_size or 20
             hardness = shape.brush_hardness or 0.5
-            
+            points = [(p[0] - ox, p[1] - oy) for p in shape.brush_points]
+
             # Draw lines connecting points with round brush tip
-            for i in range(len(shape.brush_points) - 1):
-                p1 = shape.brush_points[i]
-                p2 = shape.brush_points[i + 1]
+            for i in range(len(points) - 1):
+                p1 = points[i]
+                p2 = points[i + 1]
                 mdraw.line([p1, p2], fill=255, width=brush_size)
                 mdraw.ellipse([
                     p1[0] - brush_size//2, p1[1] - brush_size//2,
                     p1[0] + brush_size//2, p1[1] + brush_size//2
                 ], fill=255)
-                
+
             # Draw final point
-            last_point = shape.brush_points[-1]
+            last_point = points[-1]
             mdraw.ellipse([
                 last_point[0] - brush_size//2, last_point[1] - brush_size//2,
                 last_point[0] + brush_size//2, last_point[1] + brush_size//2
             ], fill=255)
-            
+
             # Apply gaussian blur based on hardness (inverse relationship)
             # Hardness 1.0 = sharp edge, 0.0 = very soft edge
             blur_radius = brush_size * (1.0 - hardness) * 0.5
             if blur_radius > 0:
                 mask = mask.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-    
+
     elif shape.type == EraseShapeType.smart and shape.color_mask:
-        # Convert PIL to OpenCV
-        cv_img = cv2.cvtColor(np.array(image), cv2.COLOR_RGBA2BGRA)
-        
+        # Convert RGBA to OpenCV channel order
+        cv_img = cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA)
+
         # Extract target color
         target_color = shape.color_mask
         tolerance = shape.smart_tolerance or 30
-        
+
         # Create a mask based on color similarity to the target color
         lower_bound = np.array([max(0, c - tolerance) for c in target_color] + [0])  # Add alpha
         upper_bound = np.array([min(255, c + tolerance) for c in target_color] + [255])  # Add alpha
-        
+
         # Create the mask
         cv_mask = cv2.inRange(cv_img, lower_bound, upper_bound)
-        
+
         # Optionally make it contiguous from a seed point
         if shape.smart_contiguous:
             # Create a mask for flood fill
-            h, w = cv_mask.shape[:2]
-            flood_mask = np.zeros((h + 2, w + 2), dtype=np.uint8)
-            
+            flood_mask = np.zeros((height + 2, width + 2), dtype=np.uint8)
+
             # Use the click point as seed
             seed_point = (shape.x, shape.y)
-            
+
             # Flood fill from seed point
             cv2.floodFill(cv_mask, flood_mask, seed_point, 255, 0, 0, cv2.FLOODFILL_FIXED_RANGE)
-            
-            # Convert the result to a PIL mask
-            mask = Image.fromarray(cv_mask)
-        else:
-            # Use the color mask directly
-            mask = Image.fromarray(cv_mask)
-    
+
+        mask_arr = cv_mask
+
+    if mask_arr is None:
+        mask_arr = np.asarray(mask)
+
     # Apply blur if requested
     if shape.blur and shape.type != EraseShapeType.brush:  # Brush already handles blur via hardness
-        mask = mask.filter(ImageFilter.GaussianBlur(radius=shape.blur_radius))
-        
-    return mask
+        mask_arr = cv2.GaussianBlur(mask_arr, (0, 0), sigmaX=shape.blur_radius)
+
+    return mask_arr
 
 
-def apply_eraser(image: Image.Image, mask: Image.Image, mosaic: bool = False, mosaic_block: int = 16) -> Image.Image:
+def apply_eraser(image: np.ndarray, mask: np.ndarray, mosaic: bool = False, mosaic_block: int = 16) -> np.ndarray:
     """
-    Apply eraser to image using mask.
-    
+    Apply eraser to an RGBA array using a mask.
+
+    The mask is treated as a per-pixel blend factor, so feathered masks
+    keep their soft edges. Everything stays in uint8/uint16 fixed point —
+    the mosaic path samples block corners and does a single nearest
+    upscale plus one fused lerp instead of two composites and two PIL
+    resizes.
+
     Args:
-        image: Source image
-        mask: Eraser mask (mode 'L')
+        image: Source RGBA uint8 array
+        mask: Eraser mask, uint8 (H, W)
         mosaic: If True, apply mosaic effect instead of transparency
         mosaic_block: Block size for mosaic effect
-        
+
     Returns:
-        Modified image
+        Modified RGBA uint8 array
     """
+    m = mask.astype(np.uint16)[..., None]
     if mosaic:
-        # Apply pixelation to the region
-        region = Image.composite(image, Image.new("RGBA", image.size, (0, 0, 0, 0)), mask)
-        
-        # Apply pixelation to region
         block = max(2, mosaic_block)
-        small = region.resize(
-            (max(1, region.width // block), max(1, region.height // block)), 
-            resample=Image.NEAREST
-        )
-        pixelated = small.resize(region.size, Image.NEAREST)
-        
-        return Image.composite(pixelated, image, mask)
+        small = image[::block, ::block]
+        pixelated = cv2.resize(small, (image.shape[1], image.shape[0]), interpolation=cv2.INTER_NEAREST)
+        blended = pixelated.astype(np.uint16) * m + image.astype(np.uint16) * (255 - m)
     else:
-        # Make the region transparent
-        transparent = Image.new("RGBA", image.size, (0, 0, 0, 0))
-        return Image.composite(transparent, image, mask)
-
+        # Fade toward fully transparent black where the mask is set
+        blended = image.astype(np.uint16) * (255 - m)
+    return ((blended + 127) // 255).astype(np.uint8)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import os
 import random
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -10,20 +12,67 @@ from PIL import Image, ImageOps
 from ...models.effects_models import FilterSpec, FilterType
 from .base import FilterStrategy
 from .factory import FilterFactory
+from .fast_kernels import vignette_u8
+
+
+# Make sure OpenCV's SIMD dispatch and internal thread pool are enabled
+cv2.setUseOptimized(True)
+cv2.setNumThreads(os.cpu_count() or 1)
+
+# Height of the horizontal stripes processed independently. Keeping each
+# stripe's working set small improves cache residency on large images,
+# and OpenCV releases the GIL so stripes can run on separate threads.
+_STRIPE_ROWS = 256
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+    return _executor
+
+
+def _apply_striped(fn, cv_img: np.ndarray, overlap: int) -> np.ndarray:
+    """Apply `fn` in overlapping horizontal stripes and reassemble.
+
+    Each stripe is padded by `overlap` rows on both sides so the filter
+    window sees the same neighborhood as in a whole-image pass; the
+    overlap rows are stripped before concatenation. Small images are
+    processed in one call.
+    """
+    height = cv_img.shape[0]
+    if height <= 2 * _STRIPE_ROWS:
+        return fn(cv_img)
+
+    stripes = []
+    for start in range(0, height, _STRIPE_ROWS):
+        end = min(start + _STRIPE_ROWS, height)
+        pad_top = min(overlap, start)
+        pad_bottom = min(overlap, height - end)
+        stripes.append((start - pad_top, end + pad_bottom, pad_top, end - start))
+
+    futures = [_get_executor().submit(fn, cv_img[s0:s1]) for s0, s1, _, _ in stripes]
+    parts = [
+        fut.result()[pad_top:pad_top + rows]
+        for fut, (_, _, pad_top, rows) in zip(futures, stripes)
+    ]
+    return np.vstack(parts)
 
 
 class OilPaintFilter(FilterStrategy):
     def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
         # Convert PIL to OpenCV
         cv_img = cv2.cvtColor(np.array(image.convert('RGB')), cv2.COLOR_RGB2BGR)
-        
+
         # Parameters
         radius = spec.radius or 4
         intensity = int(10 * (spec.strength or 0.5)) if spec.strength is not None else 5
-        
-        # Apply oil paint effect
-        oil_img = cv2.xphoto.oilPainting(cv_img, radius, intensity)
-        
+
+        # Apply oil paint effect in stripes so large images stay cache-resident
+        oil_img = _apply_striped(lambda s: cv2.xphoto.oilPainting(s, radius, intensity), cv_img, radius)
+
         # Convert back to PIL
         result = Image.fromarray(cv2.cvtColor(oil_img, cv2.COLOR_BGR2RGB)).convert('RGBA')
         
@@ -38,6 +87,71 @@ class OilPaintFilter(FilterStrategy):
         return FilterType.oil_paint.value
 
 
+class BilateralFilter(FilterStrategy):
+    def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
+        # Convert PIL to OpenCV
+        cv_img = cv2.cvtColor(np.array(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+
+        # Parameters
+        strength = spec.strength or 0.5
+        d = spec.radius or 9
+        sigma = max(1, int(150 * strength))
+
+        # Run in cache-friendly stripes; overlap covers the filter window
+        smoothed = _apply_striped(lambda s: cv2.bilateralFilter(s, d, sigma, sigma), cv_img, (d - 1) // 2)
+
+        # Convert back to PIL
+        result = Image.fromarray(cv2.cvtColor(smoothed, cv2.COLOR_BGR2RGB)).convert('RGBA')
+
+        # Preserve original alpha channel if available
+        if 'A' in image.getbands():
+            result.putalpha(image.split()[3])
+
+        return result
+
+    @classmethod
+    def filter_type(cls) -> str:
+        return FilterType.bilateral.value
+
+
+class VignetteFilter(FilterStrategy):
+    def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
+        rgb = np.asarray(image.convert('RGB'))
+        rows, cols = rgb.shape[:2]
+
+        # Stronger vignettes use a tighter Gaussian falloff
+        strength = spec.strength or 0.5
+        sigma_y = rows / (1.0 + 2.0 * strength)
+        sigma_x = cols / (1.0 + 2.0 * strength)
+
+        ky = cv2.getGaussianKernel(rows, sigma_y).astype(np.float32)
+        kx = cv2.getGaussianKernel(cols, sigma_x).astype(np.float32)
+        ky /= ky.max()
+        kx /= kx.max()
+
+        # The mask is rank-1 (ky * kx.T), so broadcast the two 1D kernels
+        # against the image directly instead of materializing an HxW mask
+        if vignette_u8 is not None:
+            # single fused jitted pass when numba is installed
+            out = vignette_u8(rgb, ky[:, 0], kx[:, 0])
+        else:
+            out = rgb.astype(np.float32)
+            out *= ky[:, :, None]
+            out *= kx[:, 0][None, :, None]
+            out = out.astype(np.uint8)
+        result = Image.fromarray(out).convert('RGBA')
+
+        # Preserve original alpha channel if available
+        if 'A' in image.getbands():
+            result.putalpha(image.split()[3])
+
+        return result
+
+    @classmethod
+    def filter_type(cls) -> str:
+        return FilterType.vignette.value
+
+
 class CartoonFilter(FilterStrategy):
     def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
         # Convert PIL to OpenCV
@@ -101,21 +215,19 @@ class PencilSketchFilter(FilterStrategy):
         # Divide the grayscale image by the blurred image
         pencil_sketch = cv2.divide(gray_img, 255 - blur, scale=256)
         
-        # Convert back to PIL
-        result = Image.fromarray(pencil_sketch)
-        
         if spec.color and shade_factor > 0:
             # Create colored pencil sketch
             colored = cv2.stylization(cv_img, sigma_s=sigma_s, sigma_r=sigma_r)
-            colored_pil = Image.fromarray(cv2.cvtColor(colored, cv2.COLOR_BGR2RGB))
-            
-            # Blend the colored image with the sketch based on shade_factor
-            result = Image.blend(
-                result.convert('RGB'), 
-                colored_pil, 
-                alpha=shade_factor
-            )
-        
+            colored_rgb = cv2.cvtColor(colored, cv2.COLOR_BGR2RGB)
+
+            # Blend sketch and colored pass in a single fused saturating
+            # OpenCV call instead of PIL convert + Image.blend copies
+            sketch_rgb = cv2.cvtColor(pencil_sketch, cv2.COLOR_GRAY2RGB)
+            blended = cv2.addWeighted(sketch_rgb, 1.0 - shade_factor, colored_rgb, shade_factor, 0)
+            result = Image.fromarray(blended)
+        else:
+            result = Image.fromarray(pencil_sketch)
+
         result = result.convert('RGBA')
         
         # Preserve original alpha channel if available
@@ -182,6 +294,10 @@ class ColorSplashFilter(FilterStrategy):
 
 
 class NoiseReductionFilter(FilterStrategy):
+    # Above this pixel count, low-strength NLMeans runs on a half-resolution
+    # image and is upscaled back: ~4x faster with little visible difference.
+    _FAST_PATH_PIXELS = 2_000_000
+
     def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
         # Convert PIL to OpenCV
         cv_img = cv2.cvtColor(np.array(image.convert('RGB')), cv2.COLOR_RGB2BGR)
@@ -198,9 +314,19 @@ class NoiseReductionFilter(FilterStrategy):
             template_size = 7  # Template patch size
             search_size = 21  # Search window size
             
-            denoised = cv2.fastNlMeansDenoisingColored(
-                cv_img, None, h, h_color, template_size, search_size
-            )
+            height, width = cv_img.shape[:2]
+            if strength < 0.5 and width * height > self._FAST_PATH_PIXELS:
+                # Denoise at half resolution and upscale back; NLMeans cost
+                # is linear in pixel count so this is roughly 4x faster
+                small = cv2.pyrDown(cv_img)
+                denoised_small = cv2.fastNlMeansDenoisingColored(
+                    small, None, h, h_color, template_size, search_size
+                )
+                denoised = cv2.pyrUp(denoised_small, dstsize=(width, height))
+            else:
+                denoised = cv2.fastNlMeansDenoisingColored(
+                    cv_img, None, h, h_color, template_size, search_size
+                )
         else:
             # Bilateral filter (preserves edges while removing noise)
             d = 9  # Diameter of pixel neighborhood
@@ -297,6 +423,8 @@ class GlitchFilter(FilterStrategy):
 
 # Register all filters with the factory
 FilterFactory.register(OilPaintFilter)
+FilterFactory.register(BilateralFilter)
+FilterFactory.register(VignetteFilter)
 FilterFactory.register(CartoonFilter)
 FilterFactory.register(PencilSketchFilter)
 FilterFactory.register(ColorSplashFilter)
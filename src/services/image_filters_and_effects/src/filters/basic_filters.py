@@ -1,16 +1,33 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
+import cv2
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter, ImageOps
 
 from ...models.effects_models import FilterSpec, FilterType
 from .base import FilterStrategy
 from .factory import FilterFactory
+from .fast_kernels import sepia_u8
+
+# Sepia transform in Q8 fixed point so the whole filter is one integer
+# matmul plus a shift instead of per-channel float32 temporaries
+_SEPIA_M_Q8 = np.round(np.array([
+    [0.393, 0.769, 0.189],
+    [0.349, 0.686, 0.168],
+    [0.272, 0.534, 0.131],
+]) * 256).astype(np.int32)
 
 
 class GrayscaleFilter(FilterStrategy):
     def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
-        return image.convert("L").convert("RGBA")
+        result = image.convert("L").convert("RGBA")
+
+        if 'A' in image.getbands():
+            result.putalpha(image.split()[3])
+
+        return result
     
     @classmethod
     def filter_type(cls) -> str:
@@ -19,14 +36,18 @@ class GrayscaleFilter(FilterStrategy):
 
 class SepiaFilter(FilterStrategy):
     def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
-        img = image.convert("RGB")
-        np_img = np.array(img, dtype=np.float32)
-        tr = 0.393 * np_img[:, :, 0] + 0.769 * np_img[:, :, 1] + 0.189 * np_img[:, :, 2]
-        tg = 0.349 * np_img[:, :, 0] + 0.686 * np_img[:, :, 1] + 0.168 * np_img[:, :, 2]
-        tb = 0.272 * np_img[:, :, 0] + 0.534 * np_img[:, :, 1] + 0.131 * np_img[:, :, 2]
-        sep = np.stack([tr, tg, tb], axis=2)
-        sep = np.clip(sep, 0, 255).astype(np.uint8)
-        return Image.fromarray(sep, mode="RGB").convert("RGBA")
+        rgb = np.asarray(image.convert("RGB"))
+        if sepia_u8 is not None:
+            # single fused jitted pass when numba is installed
+            sep = sepia_u8(rgb)
+        else:
+            sep = np.clip((rgb.astype(np.int32) @ _SEPIA_M_Q8.T) >> 8, 0, 255).astype(np.uint8)
+        result = Image.fromarray(sep, mode="RGB").convert("RGBA")
+
+        if 'A' in image.getbands():
+            result.putalpha(image.split()[3])
+
+        return result
     
     @classmethod
     def filter_type(cls) -> str:
@@ -108,11 +129,49 @@ class SaturationFilter(FilterStrategy):
         return FilterType.saturation.value
 
 
+@lru_cache(maxsize=64)
+def _gamma_lut(gamma: float) -> np.ndarray:
+    """Build a 256-entry gamma LUT with vector math, cached per gamma value."""
+    levels = np.arange(256, dtype=np.float32) / 255.0
+    return np.clip((levels ** (1.0 / gamma)) * 255.0, 0, 255).astype(np.uint8)
+
+
+class GammaFilter(FilterStrategy):
+    def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
+        # Round so repeated calls with near-identical gammas share a LUT
+        gamma = round(float(spec.amount or 1.0), 3)
+        if gamma <= 0:
+            gamma = 1.0
+        rgb = np.asarray(image.convert("RGB"))
+        out = cv2.LUT(rgb, _gamma_lut(gamma))
+        result = Image.fromarray(out).convert("RGBA")
+
+        if 'A' in image.getbands():
+            result.putalpha(image.split()[3])
+
+        return result
+
+    @classmethod
+    def filter_type(cls) -> str:
+        return FilterType.gamma.value
+
+
 class HueShiftFilter(FilterStrategy):
     def apply(self, image: Image.Image, spec: FilterSpec) -> Image.Image:
         amount = int(spec.amount or 0)
-        r, g, b, a = image.split()
-        return Image.merge("RGBA", (g, b, r, a)) if amount % 3 else image
+        if amount % 256 == 0:
+            return image
+        # Proper hue rotation in HSV_FULL space (hue spans 0-255), instead
+        # of the old coarse RGB channel rotation
+        hsv = cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2HSV_FULL)
+        hsv[..., 0] = ((hsv[..., 0].astype(np.int16) + amount) % 256).astype(np.uint8)
+        out = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB_FULL)
+        result = Image.fromarray(out).convert("RGBA")
+
+        if 'A' in image.getbands():
+            result.putalpha(image.split()[3])
+
+        return result
     
     @classmethod
     def filter_type(cls) -> str:
@@ -148,5 +207,6 @@ FilterFactory.register(EmbossFilter)
 FilterFactory.register(BrightnessFilter)
 FilterFactory.register(ContrastFilter)
 FilterFactory.register(SaturationFilter)
+FilterFactory.register(GammaFilter)
 FilterFactory.register(HueShiftFilter)
 FilterFactory.register(InvertFilter)
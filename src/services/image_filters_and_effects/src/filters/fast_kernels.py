@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+"""Optional Numba-compiled kernels for the small pure-numpy filters.
+
+sepia and vignette are single-pass numeric loops that fuse well; when
+numba is installed they run row-parallel with no temporaries, otherwise
+the strategies keep their vectorized numpy paths. (numba's AOT pycc
+compiler is deprecated upstream, so these are JIT-compiled with
+cache=True and warmed at import instead of shipping a prebuilt .so.)
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange  # type: ignore
+    _HAS_NUMBA = True
+except Exception:
+    _HAS_NUMBA = False
+
+sepia_u8 = None
+vignette_u8 = None
+
+if _HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _sepia_rows(img, out):  # pragma: no cover - compiled
+        # Q8 fixed-point sepia matrix, same coefficients as _SEPIA_M_Q8
+        height, width = img.shape[0], img.shape[1]
+        for y in prange(height):
+            for x in range(width):
+                r = int(img[y, x, 0])
+                g = int(img[y, x, 1])
+                b = int(img[y, x, 2])
+                out[y, x, 0] = min((101 * r + 197 * g + 48 * b) >> 8, 255)
+                out[y, x, 1] = min((89 * r + 176 * g + 43 * b) >> 8, 255)
+                out[y, x, 2] = min((70 * r + 137 * g + 34 * b) >> 8, 255)
+
+    def sepia_u8(img: np.ndarray) -> np.ndarray:
+        """Sepia-tone an RGB uint8 array in one fused jitted pass."""
+        out = np.empty_like(img)
+        _sepia_rows(img, out)
+        return out
+
+    @njit(parallel=True, cache=True)
+    def _vignette_rows(img, ky, kx, out):  # pragma: no cover - compiled
+        height, width = img.shape[0], img.shape[1]
+        for y in prange(height):
+            fy = ky[y]
+            for x in range(width):
+                f = fy * kx[x]
+                for c in range(3):
+                    out[y, x, c] = np.uint8(img[y, x, c] * f)
+
+    def vignette_u8(img: np.ndarray, ky: np.ndarray, kx: np.ndarray) -> np.ndarray:
+        """Apply a separable vignette falloff in one fused jitted pass."""
+        out = np.empty_like(img)
+        _vignette_rows(img, ky, kx, out)
+        return out
+
+    # Warm the JIT on a tiny tile so the first request doesn't pay compile cost
+    _tile = np.zeros((4, 4, 3), dtype=np.uint8)
+    sepia_u8(_tile)
+    vignette_u8(_tile, np.ones(4, dtype=np.float32), np.ones(4, dtype=np.float32))
+    del _tile
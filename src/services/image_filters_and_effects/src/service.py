@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import atexit
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
 from typing import Optional
@@ -11,11 +15,14 @@ from PIL import Image, ImageDraw, ImageEnhance, ImageFilter, ImageFont
 import cv2  # type: ignore
 
 try:
+    from rembg import new_session as rembg_new_session  # type: ignore
     from rembg import remove as rembg_remove  # type: ignore
     _HAS_REMBG = True
 except Exception:
     _HAS_REMBG = False
 
+from .blend_kernels import blend_over_u8
+from .filters.chain import apply_filter_chain
 from ..models.effects_models import (
     BackgroundAction,
     BackgroundActionType,
@@ -32,6 +39,134 @@ from ..models.effects_models import (
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# One pooled client for every download in this module; keep-alive avoids
+# paying TLS handshake and pool setup per fetched asset
+_HTTP = httpx.Client(timeout=30, limits=httpx.Limits(max_keepalive_connections=16))
+atexit.register(_HTTP.close)
+
+_rembg_sessions: dict = {}
+
+
+def _get_rembg_session(device: str = "auto"):
+    """Build the rembg ONNX session once per device and reuse it.
+
+    Without an explicit session rembg constructs a fresh InferenceSession
+    per call, paying graph load/optimize cost each time.
+    """
+    session = _rembg_sessions.get(device)
+    if session is None:
+        session = _build_rembg_session(device)
+        _rembg_sessions[device] = session
+    return session
+
+
+def _build_rembg_session(device: str):
+    """Build a rembg session on the requested device with CPU fallback.
+
+    "auto" walks the accelerated providers onnxruntime reports as
+    available (CUDA, then DirectML) before settling on CPU; an explicit
+    "cuda" request still falls back to CPU if session construction fails.
+    """
+    import onnxruntime as ort  # type: ignore
+
+    available = ort.get_available_providers()
+    if device == "cpu":
+        candidates = [["CPUExecutionProvider"]]
+    elif device == "cuda":
+        candidates = [["CUDAExecutionProvider", "CPUExecutionProvider"], ["CPUExecutionProvider"]]
+    else:
+        candidates = []
+        if "CUDAExecutionProvider" in available:
+            candidates.append(["CUDAExecutionProvider", "CPUExecutionProvider"])
+        if "DmlExecutionProvider" in available:
+            candidates.append(["DmlExecutionProvider", "CPUExecutionProvider"])
+        candidates.append(["CPUExecutionProvider"])
+
+    for providers in candidates:
+        try:
+            session = rembg_new_session("u2net", providers=providers)
+        except Exception:
+            logger.warning("rembg session build failed for %s, trying next provider", providers[0], exc_info=True)
+            continue
+        if os.environ.get("REMBG_FP16") == "1":
+            try:
+                session.inner_session = ort.InferenceSession(
+                    str(_fp16_model_path()), providers=providers
+                )
+            except Exception:
+                logger.warning("FP16 u2net conversion unavailable, keeping FP32 weights", exc_info=True)
+        return session
+    raise RuntimeError("Could not build a rembg session with any provider")
+
+
+def _fp16_model_path() -> Path:
+    """Return the path of the FP16-converted u2net weights, converting once.
+
+    Halving the weight precision halves the bytes moved per conv layer,
+    which is the dominant cost of the segmentation forward pass. The
+    converted model is cached next to the FP32 one; I/O tensors stay
+    float32 so the preprocessing pipeline is unchanged. Requires the
+    optional onnx/onnxconverter-common packages.
+    """
+    import onnx  # type: ignore
+    from onnxconverter_common import float16  # type: ignore
+
+    home = Path(os.environ.get("U2NET_HOME", Path.home() / ".u2net"))
+    fp16_path = home / "u2net.fp16.onnx"
+    if not fp16_path.exists():
+        model = onnx.load(str(home / "u2net.onnx"))
+        onnx.save(float16.convert_float_to_float16(model, keep_io_types=True), str(fp16_path))
+    return fp16_path
+
+
+def _rembg_batch_cutouts(images: list[Image.Image], device: str = "auto") -> list[Image.Image]:
+    """Run one batched u2net forward pass and return RGBA cutouts.
+
+    rembg itself only runs single-image inference; stacking the
+    preprocessed tensors into one (N, 3, 320, 320) batch amortizes the
+    Python/ORT dispatch overhead and lets the backend batch the GEMMs.
+    """
+    session = _get_rembg_session(device)
+    ort_session = session.inner_session
+    input_name = ort_session.get_inputs()[0].name
+
+    mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    std = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+    batch = []
+    for img in images:
+        arr = cv2.resize(np.array(img.convert("RGB")), (320, 320), interpolation=cv2.INTER_AREA)
+        arr = arr.astype(np.float32) / np.float32(max(arr.max(), 1))
+        batch.append(((arr - mean) / std).transpose(2, 0, 1))
+
+    preds = ort_session.run(None, {input_name: np.stack(batch)})[0]
+
+    cutouts = []
+    for pred, img in zip(preds, images):
+        mask = pred[0]
+        mask = (mask - mask.min()) / (mask.max() - mask.min() + 1e-8)
+        mask = cv2.resize((mask * 255).astype(np.uint8), img.size, interpolation=cv2.INTER_LANCZOS4)
+        cutout = img.convert("RGBA")
+        cutout.putalpha(Image.fromarray(mask))
+        cutouts.append(cutout)
+    return cutouts
+
+
+def _decode_image_bytes(data: bytes) -> Image.Image:
+    """Decode downloaded image bytes with OpenCV's SIMD codecs.
+
+    cv2.imdecode uses libjpeg-turbo and is several times faster than
+    PIL's decoder for JPEG; formats OpenCV cannot handle fall back to
+    PIL.
+    """
+    arr = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+    if arr is None:
+        return Image.open(BytesIO(data))
+    if arr.ndim == 2:
+        return Image.fromarray(arr)
+    if arr.shape[2] == 4:
+        return Image.fromarray(cv2.cvtColor(arr, cv2.COLOR_BGRA2RGBA), mode="RGBA")
+    return Image.fromarray(cv2.cvtColor(arr, cv2.COLOR_BGR2RGB))
+
 
 def _load_image(effects_input: EffectsInput) -> Image.Image:
     if effects_input.file_path is not None:
@@ -39,10 +174,9 @@ def _load_image(effects_input: EffectsInput) -> Image.Image:
     if effects_input.image_bytes is not None:
         return Image.open(BytesIO(effects_input.image_bytes))
     if effects_input.url is not None:
-        with httpx.Client(timeout=30) as client:
-            resp = client.get(effects_input.url)
-            resp.raise_for_status()
-            return Image.open(BytesIO(resp.content))
+        resp = _HTTP.get(effects_input.url)
+        resp.raise_for_status()
+        return _decode_image_bytes(resp.content)
     raise ValueError("Provide file_path, image_bytes, or url")
 
 
@@ -50,86 +184,103 @@ def _ensure_rgba(image: Image.Image) -> Image.Image:
     return image.convert("RGBA") if image.mode != "RGBA" else image
 
 
-def _feather_alpha(mask: Image.Image, radius: float) -> Image.Image:
-    if radius <= 0:
-        return mask
-    return mask.filter(ImageFilter.GaussianBlur(radius=radius))
+def _cutout_rgb_alpha(base: Image.Image, precut: Optional[Image.Image] = None, device: str = "auto") -> tuple[np.ndarray, np.ndarray]:
+    """Run rembg once and return the cutout as separate RGB and alpha planes.
+
+    Every background branch needs the same segmentation result; splitting
+    it into SoA planes up front lets the compositing below run as fused
+    integer passes without intermediate RGBA images.
+    """
+    if precut is not None:
+        cutout = precut
+    else:
+        cut = rembg_remove(np.array(base), session=_get_rembg_session(device))
+        cutout = Image.open(BytesIO(cut)).convert("RGBA")
+    arr = np.asarray(cutout)
+    return np.ascontiguousarray(arr[..., :3]), np.ascontiguousarray(arr[..., 3])
 
 
-def _apply_background(image: Image.Image, bg: BackgroundAction) -> Image.Image:
+def _composite_subject(canvas: np.ndarray, rgb: np.ndarray, alpha: np.ndarray, scale: float, offset: tuple[int, int]) -> np.ndarray:
+    """Alpha-over the subject onto an RGBA canvas in one fused uint16 pass.
+
+    Replaces the Image.new + resize + alpha_composite chain; the canvas
+    is modified in place and returned.
+    """
+    if scale != 1.0:
+        new_w = max(1, int(rgb.shape[1] * scale))
+        new_h = max(1, int(rgb.shape[0] * scale))
+        # INTER_AREA is both the correct and the fastest resampler when
+        # shrinking; Lanczos only pays off on upscales
+        interp = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LANCZOS4
+        rgb = cv2.resize(rgb, (new_w, new_h), interpolation=interp)
+        alpha = cv2.resize(alpha, (new_w, new_h), interpolation=interp)
+
+    dx, dy = offset
+    height, width = rgb.shape[:2]
+    full_h, full_w = canvas.shape[:2]
+    x0, y0 = max(dx, 0), max(dy, 0)
+    x1, y1 = min(dx + width, full_w), min(dy + height, full_h)
+    if x0 >= x1 or y0 >= y1:
+        return canvas
+
+    fg = rgb[y0 - dy:y1 - dy, x0 - dx:x1 - dx].astype(np.uint16)
+    fa = alpha[y0 - dy:y1 - dy, x0 - dx:x1 - dx][..., None].astype(np.uint16)
+    region = canvas[y0:y1, x0:x1]
+    bg_rgb = region[..., :3].astype(np.uint16)
+    ba = region[..., 3:].astype(np.uint16)
+    region[..., :3] = ((fg * fa + bg_rgb * (255 - fa) + 127) // 255).astype(np.uint8)
+    region[..., 3:] = (fa + (ba * (255 - fa) + 127) // 255).astype(np.uint8)
+    return canvas
+
+
+def _apply_background(image: Image.Image, bg: BackgroundAction, precut: Optional[Image.Image] = None, device: str = "auto") -> Image.Image:
     base = _ensure_rgba(image)
     if bg.action in {BackgroundActionType.remove, BackgroundActionType.transparent}:
         if _HAS_REMBG:
-            cut = rembg_remove(np.array(base))
-            cutout = Image.open(BytesIO(cut)).convert("RGBA")
+            rgb, alpha = _cutout_rgb_alpha(base, precut, device)
             # Optional feathering
-            if "A" in cutout.getbands():
-                a = cutout.split()[-1]
-                a = _feather_alpha(a, bg.feather_radius)
-                cutout.putalpha(a)
+            if bg.feather_radius > 0:
+                alpha = cv2.GaussianBlur(alpha, (0, 0), sigmaX=bg.feather_radius)
         else:
-            # Fallback: simple alpha mask by thresholding edges (not as accurate)
-            cutout = base
+            # Fallback: no segmentation available, keep the image as-is
+            arr = np.asarray(base)
+            rgb, alpha = arr[..., :3], arr[..., 3]
         if bg.action == BackgroundActionType.transparent:
-            return cutout
+            return Image.fromarray(np.dstack([rgb, alpha]), mode="RGBA")
         # Remove background -> place subject over solid white
-        canvas = Image.new("RGBA", base.size, (255, 255, 255, 255))
-        if bg.subject_scale != 1.0:
-            new_w = max(1, int(cutout.width * bg.subject_scale))
-            new_h = max(1, int(cutout.height * bg.subject_scale))
-            cutout = cutout.resize((new_w, new_h), resample=Image.LANCZOS)
-        dx, dy = bg.subject_offset_xy
-        canvas.alpha_composite(cutout)
-        return canvas
+        canvas = np.full((base.height, base.width, 4), 255, dtype=np.uint8)
+        canvas = _composite_subject(canvas, rgb, alpha, bg.subject_scale, (0, 0))
+        return Image.fromarray(canvas, mode="RGBA")
     if bg.action == BackgroundActionType.blur:
+        blurred = cv2.GaussianBlur(np.asarray(base), (0, 0), sigmaX=bg.blur_radius or 12.0)
         if _HAS_REMBG:
-            cutout = Image.open(BytesIO(rembg_remove(np.array(base)))).convert("RGBA")
-            # Build blurred background from original
-            blurred = base.filter(ImageFilter.GaussianBlur(radius=bg.blur_radius or 12.0))
-            if bg.subject_scale != 1.0:
-                new_w = max(1, int(cutout.width * bg.subject_scale))
-                new_h = max(1, int(cutout.height * bg.subject_scale))
-                cutout = cutout.resize((new_w, new_h), resample=Image.LANCZOS)
-            dx, dy = bg.subject_offset_xy
-            blurred.alpha_composite(cutout, dest=(dx, dy))
-            return blurred
-        return base.filter(ImageFilter.GaussianBlur(radius=bg.blur_radius or 12.0))
+            rgb, alpha = _cutout_rgb_alpha(base, precut, device)
+            blurred = _composite_subject(blurred, rgb, alpha, bg.subject_scale, bg.subject_offset_xy)
+        return Image.fromarray(blurred, mode="RGBA")
     if bg.action == BackgroundActionType.replace_color:
         color = bg.replace_color_rgba or (255, 255, 255, 255)
+        canvas = np.empty((base.height, base.width, 4), dtype=np.uint8)
+        canvas[:] = color
         if _HAS_REMBG:
-            cutout = Image.open(BytesIO(rembg_remove(np.array(base)))).convert("RGBA")
-            canvas = Image.new("RGBA", base.size, color)
-            if bg.subject_scale != 1.0:
-                new_w = max(1, int(cutout.width * bg.subject_scale))
-                new_h = max(1, int(cutout.height * bg.subject_scale))
-                cutout = cutout.resize((new_w, new_h), resample=Image.LANCZOS)
-            dx, dy = bg.subject_offset_xy
-            canvas.alpha_composite(cutout, dest=(dx, dy))
-            return canvas
-        return Image.new("RGBA", base.size, color)
+            rgb, alpha = _cutout_rgb_alpha(base, precut, device)
+            canvas = _composite_subject(canvas, rgb, alpha, bg.subject_scale, bg.subject_offset_xy)
+        return Image.fromarray(canvas, mode="RGBA")
     if bg.action == BackgroundActionType.replace_image:
         # load replacement image
         rep = None
         if bg.replace_image_path is not None:
             rep = Image.open(str(bg.replace_image_path)).convert("RGBA")
         elif bg.replace_image_url is not None:
-            with httpx.Client(timeout=30) as client:
-                r = client.get(bg.replace_image_url)
-                r.raise_for_status()
-                rep = Image.open(BytesIO(r.content)).convert("RGBA")
+            r = _HTTP.get(bg.replace_image_url)
+            r.raise_for_status()
+            rep = _decode_image_bytes(r.content).convert("RGBA")
         if rep is None:
             return base
-        rep = rep.resize(base.size, resample=Image.LANCZOS)
+        canvas = cv2.resize(np.array(rep), base.size, interpolation=cv2.INTER_LANCZOS4)
         if _HAS_REMBG:
-            cutout = Image.open(BytesIO(rembg_remove(np.array(base)))).convert("RGBA")
-            if bg.subject_scale != 1.0:
-                new_w = max(1, int(cutout.width * bg.subject_scale))
-                new_h = max(1, int(cutout.height * bg.subject_scale))
-                cutout = cutout.resize((new_w, new_h), resample=Image.LANCZOS)
-            dx, dy = bg.subject_offset_xy
-            rep.alpha_composite(cutout, dest=(dx, dy))
-            return rep
-        return rep
+            rgb, alpha = _cutout_rgb_alpha(base, precut, device)
+            canvas = _composite_subject(canvas, rgb, alpha, bg.subject_scale, bg.subject_offset_xy)
+        return Image.fromarray(canvas, mode="RGBA")
     return base
 
 
@@ -153,60 +304,99 @@ def _apply_filter(image: Image.Image, spec: FilterSpec) -> Image.Image:
         return image
 
 
+def _blend_u8(a: np.ndarray, b: np.ndarray, mode: str) -> np.ndarray:
+    """Blend two uint8 RGB arrays in fixed point.
+
+    Staying in uint8/uint16 avoids the four full-size float32 temporaries
+    (and two byte<->float conversion passes) of the previous float path;
+    `(x * y + 127) // 255` is the usual rounded byte multiply.
+    """
+    if mode == "multiply":
+        return ((a.astype(np.uint16) * b + 127) // 255).astype(np.uint8)
+    if mode == "screen":
+        inv = (255 - a).astype(np.uint16) * (255 - b)
+        return (255 - (inv + 127) // 255).astype(np.uint8)
+    if mode == "overlay":
+        a16 = a.astype(np.uint16)
+        b16 = b.astype(np.uint16)
+        low = (2 * a16 * b16 + 127) // 255
+        high = 255 - (2 * (255 - a16) * (255 - b16) + 127) // 255
+        return np.where(a < 128, low, high).astype(np.uint8)
+    if mode == "add":
+        return np.minimum(a.astype(np.uint16) + b, 255).astype(np.uint8)
+    if mode == "subtract":
+        return np.maximum(a.astype(np.int16) - b, 0).astype(np.uint8)
+    return b
+
+
+@lru_cache(maxsize=64)
+def _load_font(font_path: Optional[str], font_size: int) -> ImageFont.ImageFont:
+    """Load a font once per (path, size); TTF parsing is not free per call."""
+    try:
+        return ImageFont.truetype(font_path, size=font_size) if font_path else ImageFont.load_default()
+    except Exception:
+        return ImageFont.load_default()
+
+
+def _prepare_overlay(ov: OverlayItem) -> Optional[Image.Image]:
+    """Fetch, decode, resize, rotate and fade one image overlay."""
+    src = None
+    if ov.image_path is not None:
+        src = Image.open(str(ov.image_path)).convert("RGBA")
+    elif ov.image_url is not None:
+        resp = _HTTP.get(ov.image_url)
+        resp.raise_for_status()
+        src = _decode_image_bytes(resp.content).convert("RGBA")
+    if src is None:
+        return None
+    if ov.width and ov.height:
+        src = src.resize((ov.width, ov.height), resample=Image.LANCZOS)
+    if ov.rotation_deg:
+        src = src.rotate(ov.rotation_deg, expand=True)
+    if ov.opacity < 1.0:
+        alpha = src.split()[-1].point(lambda p: int(p * ov.opacity))
+        src.putalpha(alpha)
+    return src
+
+
 def _apply_overlays(image: Image.Image, overlays: list[OverlayItem]) -> Image.Image:
     canvas = image.copy()
+
+    # Fetching/decoding/resizing each image overlay is independent work;
+    # prepare them all in parallel and keep only the composite serial so
+    # blend order is preserved
+    image_overlays = [ov for ov in overlays if ov.type == OverlayType.image]
+    prepared: dict[int, Optional[Image.Image]] = {}
+    if len(image_overlays) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(image_overlays), os.cpu_count() or 1)) as pool:
+            futures = {id(ov): pool.submit(_prepare_overlay, ov) for ov in image_overlays}
+            prepared = {key: fut.result() for key, fut in futures.items()}
+
     for ov in overlays:
         if ov.type == OverlayType.image:
-            src = None
-            if ov.image_path is not None:
-                src = Image.open(str(ov.image_path)).convert("RGBA")
-            elif ov.image_url is not None:
-                with httpx.Client(timeout=30) as client:
-                    resp = client.get(ov.image_url)
-                    resp.raise_for_status()
-                    src = Image.open(BytesIO(resp.content)).convert("RGBA")
+            src = prepared[id(ov)] if id(ov) in prepared else _prepare_overlay(ov)
             if src is None:
                 continue
-            if ov.width and ov.height:
-                src = src.resize((ov.width, ov.height), resample=Image.LANCZOS)
-            if ov.rotation_deg:
-                src = src.rotate(ov.rotation_deg, expand=True)
-            if ov.opacity < 1.0:
-                alpha = src.split()[-1].point(lambda p: int(p * ov.opacity))
-                src.putalpha(alpha)
             if ov.blend_mode == "normal":
                 canvas.alpha_composite(src, (ov.x, ov.y))
             else:
-                base = canvas.copy()
-                temp = Image.new("RGBA", base.size, (0, 0, 0, 0))
+                temp = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
                 temp.alpha_composite(src, (ov.x, ov.y))
-                # convert to numpy for blend modes
-                A = np.array(base).astype(np.float32) / 255.0
-                B = np.array(temp).astype(np.float32) / 255.0
-                def blend(a, b, mode):
-                    if mode == "multiply":
-                        return a * b
-                    if mode == "screen":
-                        return 1 - (1 - a) * (1 - b)
-                    if mode == "overlay":
-                        return np.where(a < 0.5, 2 * a * b, 1 - 2 * (1 - a) * (1 - b))
-                    if mode == "add":
-                        return np.clip(a + b, 0, 1)
-                    if mode == "subtract":
-                        return np.clip(a - b, 0, 1)
-                    return b
-                rgb_a, alpha_a = A[..., :3], A[..., 3:4]
-                rgb_b, alpha_b = B[..., :3], B[..., 3:4]
-                rgb = blend(rgb_a, rgb_b, ov.blend_mode)
-                alpha = np.clip(alpha_a + alpha_b - alpha_a * alpha_b, 0, 1)
-                C = np.concatenate([rgb, alpha], axis=2)
-                canvas = Image.fromarray((C * 255).astype(np.uint8), mode="RGBA")
+                # blend in uint8 fixed point; no float32 round-trip
+                A = np.asarray(canvas)
+                B = np.asarray(temp)
+                if blend_over_u8 is not None:
+                    # single fused jitted pass when numba is installed
+                    canvas = Image.fromarray(blend_over_u8(A, B, ov.blend_mode), mode="RGBA")
+                else:
+                    rgb = _blend_u8(A[..., :3], B[..., :3], ov.blend_mode)
+                    alpha_a = A[..., 3].astype(np.uint16)
+                    alpha_b = B[..., 3].astype(np.uint16)
+                    alpha = (alpha_a + alpha_b - (alpha_a * alpha_b + 127) // 255).astype(np.uint8)
+                    canvas = Image.fromarray(np.dstack([rgb, alpha]), mode="RGBA")
         else:
             draw = ImageDraw.Draw(canvas)
-            try:
-                font = ImageFont.truetype(str(ov.font_path), size=ov.font_size) if ov.font_path else ImageFont.load_default()
-            except Exception:
-                font = ImageFont.load_default()
+            font = _load_font(str(ov.font_path) if ov.font_path else None, ov.font_size)
             draw.text((ov.x, ov.y), ov.text or "", fill=ov.font_color_rgba, font=font)
     return canvas
 
@@ -216,35 +406,73 @@ def _apply_eraser(image: Image.Image, shapes: list[EraseShape]) -> Image.Image:
     
     Uses the enhanced eraser functionality from eraser_utils module.
     """
-    from .erasers.eraser_utils import create_eraser_mask, apply_eraser
-    
-    canvas = image.copy()
+    from .erasers.eraser_utils import create_eraser_mask, apply_eraser, shape_bbox
+
+    # Decode to a single RGBA buffer up front; shapes operate on arrays
+    # and the result converts back to PIL exactly once
+    canvas = np.array(image)
+    height, width = canvas.shape[:2]
     for sh in shapes:
         try:
-            # Create mask based on shape type
-            mask = create_eraser_mask(canvas, sh)
-            
-            # Apply eraser using the mask
-            canvas = apply_eraser(canvas, mask, sh.mosaic, sh.mosaic_block)
+            # Localized shapes only need their (padded) bounding box
+            # masked and blended, so cost scales with shape area rather
+            # than canvas area; smart masks still span the full canvas
+            bbox = shape_bbox(sh, width, height)
+            if bbox is not None:
+                x0, y0, x1, y1 = bbox
+                region = canvas[y0:y1, x0:x1]
+                mask = create_eraser_mask(region, sh, origin=(x0, y0))
+                canvas[y0:y1, x0:x1] = apply_eraser(region, mask, sh.mosaic, sh.mosaic_block)
+            else:
+                mask = create_eraser_mask(canvas, sh)
+                canvas = apply_eraser(canvas, mask, sh.mosaic, sh.mosaic_block)
         except Exception as e:
             # Log any errors and continue with next shape
             print(f"Error applying eraser shape {sh.type}: {str(e)}")
             continue
-            
-    return canvas
+
+    return Image.fromarray(canvas, mode="RGBA")
 
 
 class ImageEffectsService:
     def apply(self, effects_input: EffectsInput, options: EffectsOptions, output_path: Optional[Path] = None) -> EffectsResult:
-        img = _load_image(effects_input).convert("RGBA")
+        # _ensure_rgba is a no-op when the decoder already produced RGBA
+        img = _ensure_rgba(_load_image(effects_input))
+        return self._process(img, options, output_path)
+
+    def apply_many(self, effects_inputs: list[EffectsInput], options: EffectsOptions, output_dir: Optional[Path] = None) -> list[EffectsResult]:
+        """Apply the same options to a batch of images.
+
+        When the background action needs rembg, segmentation for the whole
+        batch is fused into a single ONNX forward pass instead of one
+        session.run per image.
+        """
+        images = [_ensure_rgba(_load_image(i)) for i in effects_inputs]
+        precuts: list[Optional[Image.Image]] = [None] * len(images)
+        if images and options.background is not None and _HAS_REMBG:
+            precuts = _rembg_batch_cutouts(images, device=options.device)
+
+        out_dir = output_dir or Path("./effects")
+        return [
+            self._process(img, options, out_dir / f"output_{idx}.png", precut=precut)
+            for idx, (img, precut) in enumerate(zip(images, precuts))
+        ]
+
+    def _process(self, img: Image.Image, options: EffectsOptions, output_path: Optional[Path], precut: Optional[Image.Image] = None) -> EffectsResult:
         w, h = img.size
         out = img
 
         if options.background is not None:
-            out = _apply_background(out, options.background)
+            out = _apply_background(out, options.background, precut=precut, device=options.device)
 
-        for f in options.filters:
-            out = _apply_filter(out, f)
+        if options.filters:
+            # Chains of pointwise filters collapse into one cached LUT pass
+            fused = apply_filter_chain(out, options.filters)
+            if fused is not None:
+                out = fused
+            else:
+                for f in options.filters:
+                    out = _apply_filter(out, f)
 
         if options.overlays:
             out = _apply_overlays(out, options.overlays)
@@ -254,7 +482,7 @@ class ImageEffectsService:
 
         final_output_path = output_path or (Path("./effects") / "output.png")
         final_output_path.parent.mkdir(parents=True, exist_ok=True)
-        out.save(final_output_path, format="PNG")
+        out.save(final_output_path, format="PNG", compress_level=options.png_compress_level, optimize=False)
 
         return EffectsResult(
             output_path=final_output_path,
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+"""Perceptual hashes computed from one shared grayscale downsample.
+
+imagehash's average_hash/phash/dhash/whash each re-resize the full-
+resolution image internally, so a multi-megapixel input pays four full
+resample passes. Here the image is downsampled once to a 32x32 luma tile
+and all four hashes are derived from that small array; only dhash needs
+its own tiny 9x8 resample. Hex output matches imagehash's row-major
+64-bit format, so distances between hashes produced by this module stay
+comparable.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pywt
+from PIL import Image
+from scipy.fft import dctn
+
+
+def _bits_to_hex(bits: np.ndarray) -> str:
+    # Row-major MSB-first packing, same layout imagehash uses for its
+    # hex strings
+    return np.packbits(bits.flatten()).tobytes().hex()
+
+
+def compute_hashes_from_gray(gray: Image.Image) -> Dict[str, str]:
+    """Compute ahash/phash/dhash/whash hex strings from one grayscale image.
+
+    Args:
+        gray: The orientation-normalized image in "L" mode
+
+    Returns:
+        Mapping of hash name to its 16-character hex string
+    """
+    # BOX is the cheapest correct-average reducer and plenty for hashing
+    small = np.asarray(gray.resize((32, 32), Image.BOX), dtype=np.float32)
+
+    # ahash: 8x8 block means of the shared tile vs their global mean
+    blocks = small.reshape(8, 4, 8, 4).mean(axis=(1, 3))
+    ahash = _bits_to_hex(blocks > blocks.mean())
+
+    # dhash: horizontal gradient sign on a 9x8 grid (needs the odd width,
+    # so this is the one extra resample — of 72 pixels)
+    nine = np.asarray(gray.resize((9, 8), Image.BOX), dtype=np.float32)
+    dhash = _bits_to_hex(nine[:, 1:] > nine[:, :-1])
+
+    # phash: low-frequency 8x8 corner of the 2-D DCT vs its median
+    lowfreq = dctn(small, norm="ortho")[:8, :8]
+    phash = _bits_to_hex(lowfreq > np.median(lowfreq))
+
+    # whash: level-2 Haar approximation (32 -> 8) vs its median
+    approx = pywt.wavedec2(small / 255.0, "haar", level=2)[0]
+    whash = _bits_to_hex(approx > np.median(approx))
+
+    return {"ahash": ahash, "phash": phash, "dhash": dhash, "whash": whash}
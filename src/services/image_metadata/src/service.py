@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import atexit
+import copy
+import operator
+from functools import cached_property, lru_cache
 from io import BytesIO
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
 import httpx
+import numpy as np
 import piexif
 from PIL import Image
 
@@ -19,17 +24,61 @@ from ..models.metadata_models import (
     MetadataUpdateResult,
     XMPWriteRequest,
 )
+from .hash_utils import compute_hashes_from_gray
 from .xmp_utils import extract_xmp_from_bytes
-import imagehash
 from PIL import ImageOps
 
+# One pooled client per process; keep-alive skips the TCP+TLS handshake
+# that otherwise dominates per-fetch latency
+_HTTP = httpx.Client(
+    timeout=30,
+    follow_redirects=True,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+)
+atexit.register(_HTTP.close)
+
+_ASYNC_HTTP: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _ASYNC_HTTP
+    if _ASYNC_HTTP is None:
+        _ASYNC_HTTP = httpx.AsyncClient(
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+        )
+    return _ASYNC_HTTP
+
+
+def _dms_from_decimals(values: np.ndarray) -> np.ndarray:
+    """Convert decimal degrees to (deg, min, sec*100) rows in bulk.
+
+    One numpy pass per array, so batched GPS updates (e.g. across a
+    directory) amortize the interpreter overhead of per-coordinate
+    float math.
+    """
+    a = np.abs(np.asarray(values, dtype=np.float64))
+    deg = a.astype(np.int64)
+    frac = (a - deg) * 60.0
+    minutes = frac.astype(np.int64)
+    seconds = np.round((frac - minutes) * 6000.0).astype(np.int64)
+    return np.stack([deg, minutes, seconds], axis=-1)
+
+
+def _decimals_from_dms(dms: np.ndarray) -> np.ndarray:
+    """Convert (3, 2) rational DMS rows back to decimal degrees in bulk."""
+    d = np.asarray(dms, dtype=np.float64)
+    return (
+        d[..., 0, 0] / d[..., 0, 1]
+        + (d[..., 1, 0] / d[..., 1, 1]) / 60.0
+        + (d[..., 2, 0] / d[..., 2, 1]) / 3600.0
+    )
+
 
 def _dms_from_decimal(value: float) -> Tuple[Tuple[int, int], Tuple[int, int], Tuple[int, int]]:
-    deg = int(abs(value))
-    minutes_float = (abs(value) - deg) * 60
-    minutes = int(minutes_float)
-    seconds = round((minutes_float - minutes) * 60 * 100)
-    return (deg, 1), (minutes, 1), (int(seconds), 100)
+    deg, minutes, seconds = _dms_from_decimals(np.array([value]))[0]
+    return (int(deg), 1), (int(minutes), 1), (int(seconds), 100)
 
 
 def _decimal_from_dms(dms) -> float:
@@ -39,6 +88,96 @@ def _decimal_from_dms(dms) -> float:
     return d + (m / 60.0) + (s / 3600.0)
 
 
+@lru_cache(maxsize=4096)
+def _hash_to_int(hex_hash: str) -> int:
+    """Parse a hash hex string once; dedup scans diff one needle against
+    many haystack hashes, re-parsing the needle every call otherwise."""
+    return int(hex_hash, 16)
+
+
+@lru_cache(maxsize=256)
+def _parse_exif_cached(exif_bytes: bytes) -> Dict:
+    """Parse EXIF bytes once per blob; piexif.load is pure Python.
+
+    Every public method re-runs the parse on the same bytes when callers
+    chain extract/compute_hashes/update on one image. Callers get a deep
+    copy so mutation (e.g. update()) can't poison the cache.
+    """
+    return piexif.load(exif_bytes)
+
+
+def _fetch_to_buffer(url: str) -> BytesIO:
+    """Stream a download chunkwise into one buffer.
+
+    resp.content materializes the payload and BytesIO(resp.content) then
+    copies it again; writing chunks straight into the buffer keeps a
+    single copy in memory and starts while the socket is still receiving.
+    (Pillow needs a seekable file, so handing it the raw stream would
+    just make it spool to its own BytesIO anyway.)
+    """
+    buf = BytesIO()
+    with _HTTP.stream("GET", url) as resp:
+        resp.raise_for_status()
+        for chunk in resp.iter_bytes():
+            buf.write(chunk)
+    buf.seek(0)
+    return buf
+
+
+# Formats Pillow can round-trip EXIF through
+_EXIF_CAPABLE = frozenset({"JPEG", "JPG", "TIFF", "WEBP"})
+
+# Output directories already created this process; mkdir costs a
+# syscall per call otherwise, which shows up on sub-millisecond requests
+_ensured_dirs: set = set()
+
+
+def _ensure_parent_dir(path: Path) -> None:
+    parent = path.parent
+    if parent not in _ensured_dirs:
+        parent.mkdir(parents=True, exist_ok=True)
+        _ensured_dirs.add(parent)
+
+
+# Metadata-bearing marker segments: APP1 (EXIF/XMP), APP13 (IPTC/
+# Photoshop), COM. APP0/JFIF and APP14/Adobe stay — decoders consult
+# them for color interpretation.
+_JPEG_STRIP_MARKERS = frozenset({0xE1, 0xED, 0xFE})
+
+
+def _strip_jpeg_markers(src: bytes) -> bytes:
+    """Drop metadata segments from a JPEG stream without re-encoding.
+
+    Walks the marker segments before SOS, skips the metadata-bearing
+    ones and copies everything else verbatim, so stripping is lossless
+    and costs marker scanning instead of a full decode/re-encode cycle.
+    Raises ValueError on streams it cannot parse so the caller can fall
+    back to the Pillow path.
+    """
+    n = len(src)
+    if n < 4 or src[0:2] != b"\xff\xd8":
+        raise ValueError("not a JPEG stream")
+    view = memoryview(src)
+    out = bytearray(b"\xff\xd8")
+    i = 2
+    while i + 4 <= n:
+        if src[i] != 0xFF:
+            raise ValueError("corrupt JPEG marker")
+        marker = src[i + 1]
+        if marker in (0xD9, 0xDA):
+            # EOI, or SOS: entropy-coded data follows — copy the rest
+            out += view[i:]
+            return bytes(out)
+        seg_len = (src[i + 2] << 8) | src[i + 3]
+        end = i + 2 + seg_len
+        if seg_len < 2 or end > n:
+            raise ValueError("corrupt JPEG segment length")
+        if marker not in _JPEG_STRIP_MARKERS:
+            out += view[i:end]
+        i = end
+    raise ValueError("truncated JPEG stream")
+
+
 def _load_image_and_exif(meta_input: MetadataInput) -> tuple[Image.Image, Dict]:
     if meta_input.file_path is not None:
         image = Image.open(str(meta_input.file_path))
@@ -47,21 +186,18 @@ def _load_image_and_exif(meta_input: MetadataInput) -> tuple[Image.Image, Dict]:
         image = Image.open(BytesIO(meta_input.image_bytes))
         exif_bytes = image.info.get("exif")
     elif meta_input.url is not None:
-        with httpx.Client(timeout=30) as client:
-            resp = client.get(meta_input.url)
-            resp.raise_for_status()
-            image = Image.open(BytesIO(resp.content))
-            exif_bytes = image.info.get("exif")
+        image = Image.open(_fetch_to_buffer(meta_input.url))
+        exif_bytes = image.info.get("exif")
     else:
         raise ValueError("Provide file_path, image_bytes, or url")
 
     exif_dict: Dict = {}
     if exif_bytes:
         try:
-            exif_dict = piexif.load(exif_bytes)
+            exif_dict = copy.deepcopy(_parse_exif_cached(exif_bytes))
         except Exception:
             try:
-                exif_dict = piexif.load(image.info.get("exif", b""))
+                exif_dict = copy.deepcopy(_parse_exif_cached(image.info.get("exif", b"")))
             except Exception:
                 exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
     else:
@@ -70,20 +206,91 @@ def _load_image_and_exif(meta_input: MetadataInput) -> tuple[Image.Image, Dict]:
     return image, exif_dict
 
 
+# EXIF orientation -> numpy view transform, mirroring ImageOps.exif_transpose
+_ORIENTATION_OPS = {
+    2: np.fliplr,
+    3: lambda a: np.rot90(a, 2),
+    4: np.flipud,
+    5: lambda a: a.swapaxes(0, 1),
+    6: lambda a: np.rot90(a, -1),
+    7: lambda a: np.rot90(a, 2).swapaxes(0, 1),
+    8: np.rot90,
+}
+
+
+class Decoded:
+    """Decode state shared by multi-call flows on one input.
+
+    extract followed by compute_hashes (or normalize_orientation) on the
+    same image used to decode and exif_transpose it once per call. This
+    object loads once and defers the transpose and grayscale conversion
+    to cached properties, so callers chaining methods pay each pixel
+    pass a single time. Obtain one via ImageMetadataService.decode() and
+    pass it to the public methods via their decoded parameter.
+    """
+
+    def __init__(self, meta_input: MetadataInput):
+        self.image, self.exif = _load_image_and_exif(meta_input)
+
+    @cached_property
+    def transposed(self) -> Image.Image:
+        return ImageOps.exif_transpose(self.image)
+
+    @cached_property
+    def gray(self) -> Image.Image:
+        # Fused orientation + luma: exif_transpose copies all three
+        # channels and convert("L") makes a second full pass. Instead the
+        # luma plane is built in one integer pass (Q8 BT.601 weights,
+        # within rounding of PIL's L mode) and the flip/rotate runs as a
+        # numpy view over the single channel — a third of the traffic.
+        # uint16 upcast must cover all three channels: a uint8 array
+        # times a plain int stays uint8 and wraps
+        rgb = np.asarray(self.image.convert("RGB")).astype(np.uint16)
+        luma = ((rgb[..., 0] * 77 + rgb[..., 1] * 150 + rgb[..., 2] * 29) >> 8).astype(np.uint8)
+        orientation = (self.exif.get("0th") or {}).get(piexif.ImageIFD.Orientation, 1)
+        op = _ORIENTATION_OPS.get(orientation)
+        if op is not None:
+            luma = op(luma)
+        return Image.fromarray(np.ascontiguousarray(luma), mode="L")
+
+
 class ImageMetadataService:
-    def strip_all_metadata(self, meta_input: MetadataInput, output_path: Optional[Path] = None) -> MetadataUpdateResult:
-        image, _ = _load_image_and_exif(meta_input)
+    def decode(self, meta_input: MetadataInput) -> Decoded:
+        """Decode once for callers that will invoke several methods."""
+        return Decoded(meta_input)
+
+    def strip_all_metadata(self, meta_input: MetadataInput, output_path: Optional[Path] = None, decoded: Optional[Decoded] = None) -> MetadataUpdateResult:
         final_output_path: Optional[Path] = output_path or Path("./metadata") / "stripped.jpg"
         final_output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with BytesIO() as buf:
-            image.save(buf, format="JPEG")
-            data = buf.getvalue()
-        final_output_path.write_bytes(data)
-        return MetadataUpdateResult(output_path=final_output_path, bytes_written=final_output_path.stat().st_size, format="JPEG", updated_fields={})
-
-    def extract(self, meta_input: MetadataInput) -> MetadataExtractResult:
-        image, exif = _load_image_and_exif(meta_input)
+        # Fast path: when the source bytes are already JPEG, drop the
+        # metadata marker segments and copy the entropy data verbatim —
+        # lossless, and no decode or re-encode at all
+        src_bytes = None
+        if meta_input.file_path is not None:
+            src_bytes = Path(meta_input.file_path).read_bytes()
+        elif meta_input.image_bytes is not None:
+            src_bytes = meta_input.image_bytes
+        if src_bytes is not None and src_bytes[:2] == b"\xff\xd8":
+            try:
+                data = _strip_jpeg_markers(src_bytes)
+            except ValueError:
+                pass
+            else:
+                final_output_path.write_bytes(data)
+                return MetadataUpdateResult(output_path=final_output_path, bytes_written=len(data), format="JPEG", updated_fields={})
+
+        image = (decoded or Decoded(meta_input)).image
+        # Encode straight into the destination file: no BytesIO staging
+        # copy and no trailing stat() — tell() already knows the size
+        with open(final_output_path, "wb") as f:
+            image.save(f, format="JPEG")
+            bytes_written = f.tell()
+        return MetadataUpdateResult(output_path=final_output_path, bytes_written=bytes_written, format="JPEG", updated_fields={})
+
+    def extract(self, meta_input: MetadataInput, decoded: Optional[Decoded] = None) -> MetadataExtractResult:
+        decoded = decoded or Decoded(meta_input)
+        image, exif = decoded.image, decoded.exif
         width, height = image.size
 
         gps = GPSData()
@@ -142,8 +349,21 @@ class ImageMetadataService:
             pass
         return result
 
-    def update(self, meta_input: MetadataInput, updates: MetadataUpdateRequest, output_path: Optional[Path] = None) -> MetadataUpdateResult:
-        image, exif = _load_image_and_exif(meta_input)
+    async def extract_async(self, meta_input: MetadataInput) -> MetadataExtractResult:
+        """Extract metadata, downloading URL inputs without blocking the loop.
+
+        API handlers can fan out many extracts concurrently; the fetch
+        happens on the shared AsyncClient and the parse reuses extract().
+        """
+        if meta_input.url is not None:
+            resp = await _get_async_client().get(meta_input.url)
+            resp.raise_for_status()
+            meta_input = meta_input.model_copy(update={"url": None, "image_bytes": resp.content})
+        return self.extract(meta_input)
+
+    def update(self, meta_input: MetadataInput, updates: MetadataUpdateRequest, output_path: Optional[Path] = None, decoded: Optional[Decoded] = None) -> MetadataUpdateResult:
+        decoded = decoded or Decoded(meta_input)
+        image, exif = decoded.image, decoded.exif
 
         exif.setdefault("0th", {})
         exif.setdefault("Exif", {})
@@ -196,49 +416,51 @@ class ImageMetadataService:
         final_output_path: Optional[Path] = output_path
         if final_output_path is None:
             final_output_path = Path("./metadata") / "updated.jpg"
-        final_output_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Convert to JPEG if original format cannot embed EXIF easily
         save_format = (image.format or "JPEG").upper()
-        if save_format not in {"JPEG", "JPG", "TIFF", "WEBP"}:  # PNG doesn't support EXIF reliably
+        if save_format not in _EXIF_CAPABLE:  # PNG doesn't support EXIF reliably
             save_format = "JPEG"
             final_output_path = final_output_path.with_suffix(".jpg")
+        _ensure_parent_dir(final_output_path)
 
-        with BytesIO() as buf:
-            image.save(buf, format=save_format, exif=exif_bytes)
-            data = buf.getvalue()
-
-        final_output_path.write_bytes(data)
+        with open(final_output_path, "wb") as f:
+            image.save(f, format=save_format, exif=exif_bytes)
+            bytes_written = f.tell()
 
         return MetadataUpdateResult(
             output_path=final_output_path,
-            bytes_written=final_output_path.stat().st_size,
+            bytes_written=bytes_written,
             format=save_format,
             updated_fields=updated,
         )
 
-    def compute_hashes(self, meta_input: MetadataInput) -> HashResult:
-        image, _ = _load_image_and_exif(meta_input)
-        gray = ImageOps.exif_transpose(image).convert("L")
-        return HashResult(
-            ahash=str(imagehash.average_hash(gray)),
-            phash=str(imagehash.phash(gray)),
-            dhash=str(imagehash.dhash(gray)),
-            whash=str(imagehash.whash(gray)),
-        )
+    def compute_hashes(self, meta_input: MetadataInput, decoded: Optional[Decoded] = None) -> HashResult:
+        decoded = decoded or Decoded(meta_input)
+        # One shared 32x32 downsample feeds all four hashes instead of
+        # four independent full-image resamples inside imagehash
+        return HashResult(**compute_hashes_from_gray(decoded.gray))
 
-    def normalize_orientation(self, meta_input: MetadataInput, output_path: Optional[Path] = None) -> MetadataUpdateResult:
-        image, exif = _load_image_and_exif(meta_input)
-        fixed = ImageOps.exif_transpose(image)
+    def normalize_orientation(self, meta_input: MetadataInput, output_path: Optional[Path] = None, decoded: Optional[Decoded] = None) -> MetadataUpdateResult:
+        decoded = decoded or Decoded(meta_input)
+        image, exif = decoded.image, decoded.exif
+        fixed = decoded.transposed
         final_output_path: Optional[Path] = output_path or Path("./metadata") / "normalized.jpg"
         final_output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        exif_bytes = piexif.dump(exif)
-        with BytesIO() as buf:
-            fixed.save(buf, format=(image.format or "JPEG"), exif=exif_bytes)
-            data = buf.getvalue()
-        final_output_path.write_bytes(data)
-        return MetadataUpdateResult(output_path=final_output_path, bytes_written=final_output_path.stat().st_size, format=image.format, updated_fields={})
+        # Only dump when there is EXIF to carry over; piexif.dump is a
+        # pure-Python serializer costing tens of ms on tag-heavy images.
+        # Since the pixels were transposed, reset Orientation so viewers
+        # don't rotate the already-normalized output a second time.
+        if any(exif.get(ifd) for ifd in ("0th", "Exif", "GPS", "1st")):
+            exif.setdefault("0th", {})[piexif.ImageIFD.Orientation] = 1
+            exif_bytes = piexif.dump(exif)
+        else:
+            exif_bytes = b""
+        with open(final_output_path, "wb") as f:
+            fixed.save(f, format=(image.format or "JPEG"), exif=exif_bytes)
+            bytes_written = f.tell()
+        return MetadataUpdateResult(output_path=final_output_path, bytes_written=bytes_written, format=image.format, updated_fields={})
 
     def diff(self, left: MetadataExtractResult, right: MetadataExtractResult, left_hash: HashResult | None = None, right_hash: HashResult | None = None) -> MetadataDiffResult:
         diffs: Dict[str, dict] = {}
@@ -254,9 +476,10 @@ class ImageMetadataService:
             "model",
             "software",
         ]
-        for f in fields:
-            lv = getattr(left, f)
-            rv = getattr(right, f)
+        # One attrgetter call per side instead of repeated getattr lookups
+        left_vals = operator.attrgetter(*fields)(left)
+        right_vals = operator.attrgetter(*fields)(right)
+        for f, lv, rv in zip(fields, left_vals, right_vals):
             if lv != rv:
                 diffs[f] = {"left": lv, "right": rv}
 
@@ -268,35 +491,53 @@ class ImageMetadataService:
         hamming = None
         if left_hash and right_hash:
             try:
-                hamming = imagehash.hex_to_hash(left_hash.phash) - imagehash.hex_to_hash(right_hash.phash)
-            except Exception:
+                # XOR + POPCNT beats imagehash's bool-array round-trip by
+                # orders of magnitude for bulk N^2 dedup scans
+                hamming = (_hash_to_int(left_hash.phash) ^ _hash_to_int(right_hash.phash)).bit_count()
+            except ValueError:
                 hamming = None
 
         return MetadataDiffResult(left=left, right=right, diffs=diffs, hash_hamming_distance=hamming)
 
     def write_xmp_sidecar(self, meta_input: MetadataInput, xmp: XMPWriteRequest, output_path: Optional[Path] = None) -> Path:
         # Sidecar XMP (minimal implementation without libxmp dependency)
-        # Writes a .xmp file next to the desired output_path (or ./metadata/sidecar.xmp)
-        from xml.sax.saxutils import escape
+        # Writes a .xmp file next to the desired output_path (or ./metadata/sidecar.xmp).
+        # Built with ElementTree instead of f-string concatenation: the
+        # C-backed serializer escapes in bulk rather than per character
+        # and cannot emit malformed markup on edge-case text.
+        import xml.etree.ElementTree as ET
+
+        X_NS = "adobe:ns:meta/"
+        RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+        DC_NS = "http://purl.org/dc/elements/1.1/"
+        XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+        ET.register_namespace("x", X_NS)
+        ET.register_namespace("rdf", RDF_NS)
+        ET.register_namespace("dc", DC_NS)
 
         final_output_path = output_path or (Path("./metadata") / "sidecar.xmp")
         final_output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        subjects_xml = "".join([f"<rdf:li>{escape(s)}</rdf:li>" for s in xmp.subjects])
-        xml = f"""<?xml version=\"1.0\" encoding=\"UTF-8\"?>
-<x:xmpmeta xmlns:x=\"adobe:ns:meta/\">
-  <rdf:RDF xmlns:rdf=\"http://www.w3.org/1999/02/22-rdf-syntax-ns#\" xmlns:dc=\"http://purl.org/dc/elements/1.1/\">
-    <rdf:Description rdf:about=\"\">
-      {f'<dc:title><rdf:Alt><rdf:li xml:lang=\'x-default\'>{escape(xmp.title or "")}</rdf:li></rdf:Alt></dc:title>'}
-      {f'<dc:description><rdf:Alt><rdf:li xml:lang=\'x-default\'>{escape(xmp.description or "")}</rdf:li></rdf:Alt></dc:description>'}
-      {f'<dc:creator><rdf:Seq><rdf:li>{escape(xmp.creator or "")}</rdf:li></rdf:Seq></dc:creator>'}
-      {f'<dc:rights><rdf:Alt><rdf:li xml:lang=\'x-default\'>{escape(xmp.rights or "")}</rdf:li></rdf:Alt></dc:rights>'}
-      {f'<dc:subject><rdf:Bag>{subjects_xml}</rdf:Bag></dc:subject>'}
-    </rdf:Description>
-  </rdf:RDF>
-</x:xmpmeta>
-"""
-        final_output_path.write_text(xml, encoding="utf-8")
+        root = ET.Element(f"{{{X_NS}}}xmpmeta")
+        rdf = ET.SubElement(root, f"{{{RDF_NS}}}RDF")
+        desc = ET.SubElement(rdf, f"{{{RDF_NS}}}Description", {f"{{{RDF_NS}}}about": ""})
+
+        def _alt(tag: str, value: str) -> None:
+            alt = ET.SubElement(ET.SubElement(desc, f"{{{DC_NS}}}{tag}"), f"{{{RDF_NS}}}Alt")
+            li = ET.SubElement(alt, f"{{{RDF_NS}}}li", {XML_LANG: "x-default"})
+            li.text = value
+
+        _alt("title", xmp.title or "")
+        _alt("description", xmp.description or "")
+        seq = ET.SubElement(ET.SubElement(desc, f"{{{DC_NS}}}creator"), f"{{{RDF_NS}}}Seq")
+        ET.SubElement(seq, f"{{{RDF_NS}}}li").text = xmp.creator or ""
+        _alt("rights", xmp.rights or "")
+        bag = ET.SubElement(ET.SubElement(desc, f"{{{DC_NS}}}subject"), f"{{{RDF_NS}}}Bag")
+        for s in xmp.subjects:
+            ET.SubElement(bag, f"{{{RDF_NS}}}li").text = s
+
+        ET.ElementTree(root).write(str(final_output_path), xml_declaration=True, encoding="utf-8")
         return final_output_path
 
 
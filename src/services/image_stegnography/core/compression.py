@@ -5,27 +5,107 @@ Compression utilities for steganography operations
 import zlib
 from typing import Tuple
 
+try:
+    import zstandard
+    _HAS_ZSTD = True
+except Exception:
+    _HAS_ZSTD = False
 
-def compress_data(data: bytes, level: int = 9) -> Tuple[bytes, bool]:
+# zstd frame magic number. A zlib stream can never begin with this byte
+# sequence, so decompress_data dispatches on it and legacy zlib payloads
+# remain readable without a header version bump.
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Chunk size for the streaming zlib path; 1 MB keeps the working set
+# cache-friendly while making the early-abort check frequent enough
+_COMPRESS_CHUNK = 1 << 20
+
+# Payloads at or above this size go through the multithreaded zstd
+# context; below it the worker handoff costs more than it saves
+_ZSTD_MT_THRESHOLD = 1 << 20
+
+if _HAS_ZSTD:
+    # Context construction is not free; reuse module-level singletons
+    _ZSTD_COMPRESSOR = zstandard.ZstdCompressor(level=3)
+    _ZSTD_COMPRESSOR_MT = zstandard.ZstdCompressor(level=3, threads=-1)
+    _ZSTD_DECOMPRESSOR = zstandard.ZstdDecompressor()
+    _DECOMPRESS_ERRORS = (zlib.error, zstandard.ZstdError)
+else:
+    _DECOMPRESS_ERRORS = (zlib.error,)
+
+
+# Compressibility probe: incompressible payloads (media files, archives,
+# already-encrypted blobs) are detected from a small prefix before
+# paying for a full compression pass. Only payloads big enough for that
+# pass to matter are probed; the prefix can be unrepresentative, so the
+# ratio threshold is deliberately lax.
+_PROBE_SIZE = 4096
+_PROBE_MIN_DATA = 64 * 1024
+_PROBE_RATIO = 0.95
+
+
+def _looks_compressible(data: bytes) -> bool:
+    if len(data) < _PROBE_MIN_DATA:
+        return True
+    sample = bytes(data[:_PROBE_SIZE])
+    # zlib level 1 on 4 KB costs microseconds and tracks the real
+    # codec's verdict closely enough for a yes/no answer
+    return len(zlib.compress(sample, 1)) < _PROBE_RATIO * len(sample)
+
+
+def compress_data(data: bytes, level: int = 6) -> Tuple[bytes, bool]:
     """
-    Compress data using zlib if it results in size reduction
+    Compress data if it results in size reduction
+    
+    Uses zstd (level 3) when the optional zstandard package is installed —
+    equal-or-better ratio than zlib at several times the throughput — and
+    falls back to zlib otherwise. The level argument only applies to the
+    zlib path.
     
     Args:
         data: Data to compress
-        level: Compression level (1-9, 9 being highest)
+        level: zlib compression level (1-9; the default 6 is zlib's own
+            ratio/speed knee — level 9 costs far more CPU for a marginal
+            ratio gain)
         
     Returns:
         Tuple of (compressed_data, was_compressed)
     """
+    if not _looks_compressible(data):
+        return data, False
+
+    if _HAS_ZSTD:
+        if len(data) >= _ZSTD_MT_THRESHOLD:
+            compressed = _ZSTD_COMPRESSOR_MT.compress(data)
+        else:
+            compressed = _ZSTD_COMPRESSOR.compress(data)
+
+        # Only return compressed if it's actually smaller
+        if len(compressed) < len(data):
+            return compressed, True
+
+        return data, False
+
     if level < 1 or level > 9:
-        level = 9  # Default to highest compression
-    
-    compressed = zlib.compress(data, level=level)
-    
-    # Only return compressed if it's actually smaller
-    if len(compressed) < len(data):
-        return compressed, True
-    
+        level = 6  # zlib's own default
+
+    # Stream through compressobj instead of zlib.compress so large
+    # secrets never hold input and output fully doubled in memory, and
+    # incompressible payloads (archives, encrypted blobs) abort as soon
+    # as the output catches up with the input instead of compressing to
+    # the end just to throw the result away.
+    compressor = zlib.compressobj(level)
+    out = bytearray()
+    view = memoryview(data)
+    for start in range(0, len(data), _COMPRESS_CHUNK):
+        out += compressor.compress(view[start : start + _COMPRESS_CHUNK])
+        if len(out) >= len(data):
+            return data, False
+    out += compressor.flush()
+
+    if len(out) < len(data):
+        return bytes(out), True
+
     return data, False
 
 
@@ -47,8 +127,49 @@ def decompress_data(data: bytes, was_compressed: bool) -> bytes:
         return data
     
     try:
+        if _HAS_ZSTD and data.startswith(_ZSTD_MAGIC):
+            return _ZSTD_DECOMPRESSOR.decompress(data)
         return zlib.decompress(data)
-    except zlib.error as e:
+    except _DECOMPRESS_ERRORS as e:
+        raise ValueError(f"Failed to decompress payload: {e}")
+
+
+def decompress_stream(data: bytes, was_compressed: bool):
+    """
+    Yield decompressed data as chunks instead of one full buffer
+    
+    Lets callers stream large payloads straight to disk so the
+    decompressed output never has to sit fully in memory next to the
+    compressed input. Uncompressed data is yielded back as-is.
+    
+    Args:
+        data: Data to potentially decompress
+        was_compressed: Whether the data was compressed
+        
+    Yields:
+        Decompressed chunks of data
+        
+    Raises:
+        ValueError: If decompression fails
+    """
+    if not was_compressed:
+        yield data
+        return
+    
+    try:
+        if _HAS_ZSTD and data.startswith(_ZSTD_MAGIC):
+            decompressor = _ZSTD_DECOMPRESSOR.decompressobj()
+        else:
+            decompressor = zlib.decompressobj()
+        view = memoryview(data)
+        for start in range(0, len(data), _COMPRESS_CHUNK):
+            chunk = decompressor.decompress(view[start : start + _COMPRESS_CHUNK])
+            if chunk:
+                yield chunk
+        chunk = decompressor.flush()
+        if chunk:
+            yield chunk
+    except _DECOMPRESS_ERRORS as e:
         raise ValueError(f"Failed to decompress payload: {e}")
 
 
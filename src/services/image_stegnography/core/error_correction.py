@@ -2,41 +2,78 @@
 Error correction utilities for steganography operations
 """
 
-from typing import Dict
+import numpy as np
+
 from ..models.stego_models import ErrorCorrectionLevel
 
+try:
+    from reedsolo import RSCodec, ReedSolomonError  # type: ignore
+    _HAS_REEDSOLO = True
+except Exception:
+    _HAS_REEDSOLO = False
+
+# Parity symbols per 255-byte block when Reed-Solomon is available:
+# ~4/8/16% overhead correcting 5/10/20 byte errors per block, versus
+# the repetition code's 100-300% overhead for single-flip protection
+_RS_NSYM = {
+    ErrorCorrectionLevel.LOW: 10,
+    ErrorCorrectionLevel.MEDIUM: 20,
+    ErrorCorrectionLevel.HIGH: 40,
+}
+
+# Repetition counts per level for the dependency-free fallback path,
+# built once at module load instead of as a dict literal per call.
+# NONE maps to 1 so lookups never need a fallback branch.
+_REPS = {
+    ErrorCorrectionLevel.NONE: 1,
+    ErrorCorrectionLevel.LOW: 2,
+    ErrorCorrectionLevel.MEDIUM: 3,
+    ErrorCorrectionLevel.HIGH: 4,
+}
+
+_rs_codecs: dict = {}
+
+
+def _rs_codec(nsym: int):
+    codec = _rs_codecs.get(nsym)
+    if codec is None:
+        codec = _rs_codecs[nsym] = RSCodec(nsym)
+    return codec
 
-def add_error_correction(data: bytes, level: ErrorCorrectionLevel) -> bytes:
+
+def add_error_correction(data: bytes, level: ErrorCorrectionLevel) -> "bytes | bytearray | memoryview":
     """
     Add error correction based on level using simple repetition code
     
-    Note: This is a basic implementation for demonstration.
-    In production, more sophisticated error correction codes
-    (Reed-Solomon, BCH, etc.) should be used.
+    Uses Reed-Solomon when the optional reedsolo package is installed —
+    far better correction per overhead byte than repetition — and falls
+    back to the repetition code otherwise. Embed and reveal must run in
+    environments with the same codec available, since the stego header
+    only records the level.
     
     Args:
         data: Data to add error correction to
         level: Error correction level
         
     Returns:
-        Data with error correction added
+        Data with error correction added, as a bytes-like object (a view
+        over the working buffer where possible, to avoid a final copy)
     """
     if level == ErrorCorrectionLevel.NONE:
         return data
     
-    repetitions = {
-        ErrorCorrectionLevel.LOW: 2,
-        ErrorCorrectionLevel.MEDIUM: 3,
-        ErrorCorrectionLevel.HIGH: 4
-    }.get(level, 1)
+    if _HAS_REEDSOLO:
+        # RSCodec.encode already returns a fresh bytearray; no copy needed
+        return _rs_codec(_RS_NSYM[level]).encode(data)
     
-    # Simple repetition code - repeat each byte N times
-    result = bytearray()
-    for b in data:
-        for _ in range(repetitions):
-            result.append(b)
+    repetitions = _REPS[level]
     
-    return bytes(result)
+    # Simple repetition code - repeat each byte N times. np.repeat runs
+    # the expansion in C; the old per-byte Python loop dominated large
+    # payloads.
+    # memoryview over the repeated array skips the final tobytes copy;
+    # AES-GCM and the header builder both accept buffer-protocol objects
+    return memoryview(np.repeat(np.frombuffer(data, dtype=np.uint8), repetitions))
 
 
 def correct_errors(data: bytes, level: ErrorCorrectionLevel) -> bytes:
@@ -56,38 +93,31 @@ def correct_errors(data: bytes, level: ErrorCorrectionLevel) -> bytes:
     if level == ErrorCorrectionLevel.NONE:
         return data
     
-    repetitions = {
-        ErrorCorrectionLevel.LOW: 2,
-        ErrorCorrectionLevel.MEDIUM: 3,
-        ErrorCorrectionLevel.HIGH: 4
-    }.get(level, 1)
+    if _HAS_REEDSOLO:
+        try:
+            return bytes(_rs_codec(_RS_NSYM[level]).decode(data)[0])
+        except ReedSolomonError as e:
+            raise ValueError("Corrupted data for error correction") from e
+    
+    repetitions = _REPS[level]
     
     if len(data) % repetitions != 0:
         raise ValueError("Corrupted data for error correction")
     
-    result = bytearray()
-    for i in range(0, len(data), repetitions):
-        chunk = data[i:i+repetitions]
-        
-        # Count occurrences of each value and use majority voting
-        counts: Dict[int, int] = {}
-        for b in chunk:
-            counts[b] = counts.get(b, 0) + 1
-        
-        # Find the most common value
-        max_count = 0
-        max_byte = 0
-        for b, count in counts.items():
-            if count > max_count:
-                max_count = count
-                max_byte = b
-        
-        result.append(max_byte)
-    
-    return bytes(result)
+    # Majority voting, vectorized. For odd repetition counts the true
+    # majority is the median of each sorted group; for even counts a
+    # per-row bincount picks the most frequent value (ties resolve to
+    # the smallest byte, which only matters for uncorrectable damage).
+    arr = np.frombuffer(data, dtype=np.uint8).reshape(-1, repetitions)
+    if repetitions % 2 == 1:
+        return np.sort(arr, axis=1)[:, repetitions // 2].tobytes()
+    counts = np.zeros((arr.shape[0], 256), dtype=np.int32)
+    rows = np.repeat(np.arange(arr.shape[0]), repetitions)
+    np.add.at(counts, (rows, arr.ravel()), 1)
+    return counts.argmax(axis=1).astype(np.uint8).tobytes()
 
 
-def get_error_correction_overhead(level: ErrorCorrectionLevel) -> int:
+def get_error_correction_overhead(level: ErrorCorrectionLevel) -> float:
     """
     Calculate the overhead added by error correction
     
@@ -95,15 +125,14 @@ def get_error_correction_overhead(level: ErrorCorrectionLevel) -> int:
         level: Error correction level
         
     Returns:
-        Multiplier for data size (e.g., 2 means data is 2x larger)
+        Multiplier for data size (e.g., 2.0 means data is 2x larger);
+        fractional for the Reed-Solomon codec
     """
     if level == ErrorCorrectionLevel.NONE:
         return 1
     
-    repetitions = {
-        ErrorCorrectionLevel.LOW: 2,
-        ErrorCorrectionLevel.MEDIUM: 3,
-        ErrorCorrectionLevel.HIGH: 4
-    }.get(level, 1)
+    if _HAS_REEDSOLO:
+        nsym = _RS_NSYM[level]
+        return (255 + nsym) / 255
     
-    return repetitions
+    return _REPS[level]
@@ -5,6 +5,7 @@ Main service class for Image Steganography operations
 from pathlib import Path
 from typing import List, Optional, Tuple, Union
 
+import numpy as np
 from PIL import Image
 
 from ..models.stego_models import (
@@ -24,16 +25,34 @@ from .steganography import (
     embed_bits_into_image,
     extract_bits_from_image,
     build_payload,
+    parse_header,
     parse_payload,
+    HEADER_SIZE,
     MAGIC,
 )
-from .encryption import decrypt_if_needed
-from .compression import decompress_data
+from .encryption import decrypt_if_needed, DEFAULT_AEAD_NAME, PASSWORD_OVERHEAD
+from .compression import decompress_data, decompress_stream
 from .visualization import generate_all_bit_planes, generate_single_bit_plane
 from ..utils.validation import validate_limits, validate_payload_fits
 from ..utils.image_utils import calculate_pixel_count
 
 
+_CH_FROM_STR = {"R": RGBChannel.RED, "G": RGBChannel.GREEN, "B": RGBChannel.BLUE}
+
+
+def _channels_from_str(channels_str: str) -> Union[RGBChannel, List[RGBChannel]]:
+    """Decode the channels string stored in a stego header."""
+    if len(channels_str) == 3:
+        return RGBChannel.ALL
+    return [_CH_FROM_STR[c] for c in channels_str if c in _CH_FROM_STR]
+
+
+def _as_rgb_array(image: Image.Image) -> np.ndarray:
+    """Convert once to an (H, W, 3) uint8 array without an extra copy."""
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    return np.asarray(rgb, dtype=np.uint8)
+
+
 class ImageStegoService:
     """
     Main service class for Image Steganography operations
@@ -64,9 +83,9 @@ class ImageStegoService:
         )
         
         # Calculate header overhead
-        header_overhead = len(MAGIC) + 1 + 4 + 4 + 1 + 1 + 2 + 2 + 2 + 1  # Base header size
+        header_overhead = len(MAGIC) + HEADER_SIZE  # Base header size
         max_text_chars = max(0, (total_bytes - header_overhead))
-        max_text_chars_pwd = max(0, (total_bytes - header_overhead - (16 + 12)))  # salt+nonce
+        max_text_chars_pwd = max(0, (total_bytes - header_overhead - PASSWORD_OVERHEAD))  # salt+verifier, nonce+id, tag
         
         return StegoCapacityResult(
             capacity_bits=total_bits,
@@ -103,14 +122,24 @@ class ImageStegoService:
             cover, bits_per_channel, channels
         )
         
-        # Build payload
+        # Fast-fail before paying for compression, error correction and
+        # encryption: without compression the final payload can only be
+        # larger than header + data, so an oversized secret is rejected
+        # up front. Compressed payloads skip this (the ratio is unknown
+        # until compression runs) and rely on the post-build check.
         data = req.text.encode("utf-8")
+        if not options.compress:
+            min_payload_bytes = len(MAGIC) + HEADER_SIZE + len(data)
+            validate_payload_fits(min_payload_bytes * 8, total_bits)
+        
+        # Build payload
         payload, is_compressed, compression_ratio = build_payload(
             payload_type=1, 
             data=data, 
             password=options.password, 
             filename=None,
             compress=options.compress,
+            compress_level=options.compress_level,
             error_correction_level=options.error_correction.value,
             bits_per_channel=bits_per_channel,
             channels=channels
@@ -138,7 +167,7 @@ class ImageStegoService:
             payload_size_bytes=len(payload),
             overhead_bytes=len(payload) - len(data),
             encrypted=bool(options.password),
-            encryption="AES-GCM" if options.password else None,
+            encryption=DEFAULT_AEAD_NAME if options.password else None,
             kdf="Scrypt" if options.password else None,
             compression="zlib" if is_compressed else None,
             compression_ratio=compression_ratio if is_compressed else None,
@@ -166,40 +195,30 @@ class ImageStegoService:
         Raises:
             ValueError: If payload is not text or decryption fails
         """
-        # Start with 1 bpc and all channels to read header
-        total_bits, total_bytes, _ = calculate_capacity(stego_image, 1, RGBChannel.ALL)
-        
-        # Read a reasonable prefix to parse header
-        prefix_bits = min(total_bits, 8 * 4096)
-        raw = extract_bits_from_image(stego_image, prefix_bits, 1, RGBChannel.ALL)
-        
-        # Parse header
-        payload_type, is_compressed, bits_per_channel, salt, nonce, _, channels_str, enc = parse_payload(raw)
+        # Convert to pixels once; all extraction passes reuse the array
+        arr = _as_rgb_array(stego_image)
+        total_bits = arr.size  # 1 bpc across all three channels
+        
+        # Read just the fixed header (184 bits) to learn every section
+        # length, then extract exactly the payload's length — no more
+        # fixed-size prefix guess, which silently truncated payloads
+        # larger than the guess
+        header_bits = min(total_bits, (len(MAGIC) + HEADER_SIZE) * 8)
+        raw = extract_bits_from_image(arr, header_bits, 1, RGBChannel.ALL)
+        payload_type, is_compressed, bits_per_channel, enc_len, salt_len, nonce_len, fname_len, channels_len = parse_header(raw)
         
         if payload_type != 1:
             raise ValueError("Payload is not text")
         
-        # Convert channels string to RGBChannel
-        channels = []
-        for c in channels_str:
-            if c == 'R':
-                channels.append(RGBChannel.RED)
-            elif c == 'G':
-                channels.append(RGBChannel.GREEN)
-            elif c == 'B':
-                channels.append(RGBChannel.BLUE)
+        total_len = len(MAGIC) + HEADER_SIZE + salt_len + nonce_len + fname_len + channels_len + enc_len
+        raw = extract_bits_from_image(arr, min(total_bits, total_len * 8), 1, RGBChannel.ALL)
+        payload_type, is_compressed, bits_per_channel, salt, nonce, _, channels_str, enc = parse_payload(raw)
         
-        # If all channels are used, use the ALL enum
-        if len(channels) == 3 and all(c in channels for c in [RGBChannel.RED, RGBChannel.GREEN, RGBChannel.BLUE]):
-            channels = RGBChannel.ALL
+        channels = _channels_from_str(channels_str)
         
         # Re-extract using the correct bits per channel and channels if needed
         if bits_per_channel > 1 or channels != RGBChannel.ALL:
-            # Calculate needed header size
-            total_len = len(MAGIC) + 1 + 4 + 4 + 1 + 1 + 2 + 2 + 2 + 1 + len(salt) + len(nonce) + len(enc) + len(channels_str)
-            
-            # Re-extract with correct parameters
-            raw = extract_bits_from_image(stego_image, total_len * 8, bits_per_channel, channels)
+            raw = extract_bits_from_image(arr, total_len * 8, bits_per_channel, channels)
             payload_type, is_compressed, bits_per_channel, salt, nonce, _, channels_str, enc = parse_payload(raw)
         
         # Attempt decrypt with password
@@ -255,6 +274,12 @@ class ImageStegoService:
             cover, bits_per_channel, channels
         )
         
+        # Fast-fail before the compression/EC/encryption pipeline, as in
+        # hide_text; only valid when compression cannot shrink the data
+        if not options.compress:
+            min_payload_bytes = len(MAGIC) + HEADER_SIZE + len(data)
+            validate_payload_fits(min_payload_bytes * 8, total_bits)
+        
         # Build payload
         payload, is_compressed, compression_ratio = build_payload(
             payload_type=2, 
@@ -262,6 +287,7 @@ class ImageStegoService:
             password=options.password, 
             filename=filename,
             compress=options.compress,
+            compress_level=options.compress_level,
             error_correction_level=options.error_correction.value,
             bits_per_channel=bits_per_channel,
             channels=channels
@@ -289,7 +315,7 @@ class ImageStegoService:
             payload_size_bytes=len(payload),
             overhead_bytes=len(payload) - len(data),
             encrypted=bool(options.password),
-            encryption="AES-GCM" if options.password else None,
+            encryption=DEFAULT_AEAD_NAME if options.password else None,
             kdf="Scrypt" if options.password else None,
             compression="zlib" if is_compressed else None,
             compression_ratio=compression_ratio if is_compressed else None,
@@ -319,40 +345,30 @@ class ImageStegoService:
         Raises:
             ValueError: If payload is not a file or decryption fails
         """
-        # Start with 1 bpc and all channels to read header
-        total_bits, total_bytes, _ = calculate_capacity(stego_image, 1, RGBChannel.ALL)
-        
-        # Read a reasonable prefix to parse header
-        prefix_bits = min(total_bits, 8 * 8192)
-        raw = extract_bits_from_image(stego_image, prefix_bits, 1, RGBChannel.ALL)
-        
-        # Parse header
-        payload_type, is_compressed, bits_per_channel, salt, nonce, fname, channels_str, enc = parse_payload(raw)
+        # Convert to pixels once; all extraction passes reuse the array
+        arr = _as_rgb_array(stego_image)
+        total_bits = arr.size  # 1 bpc across all three channels
+        
+        # Read just the fixed header (184 bits) to learn every section
+        # length, then extract exactly the payload's length — no more
+        # fixed-size prefix guess, which silently truncated payloads
+        # larger than the guess
+        header_bits = min(total_bits, (len(MAGIC) + HEADER_SIZE) * 8)
+        raw = extract_bits_from_image(arr, header_bits, 1, RGBChannel.ALL)
+        payload_type, is_compressed, bits_per_channel, enc_len, salt_len, nonce_len, fname_len, channels_len = parse_header(raw)
         
         if payload_type != 2:
             raise ValueError("Payload is not file")
         
-        # Convert channels string to RGBChannel
-        channels = []
-        for c in channels_str:
-            if c == 'R':
-                channels.append(RGBChannel.RED)
-            elif c == 'G':
-                channels.append(RGBChannel.GREEN)
-            elif c == 'B':
-                channels.append(RGBChannel.BLUE)
+        total_len = len(MAGIC) + HEADER_SIZE + salt_len + nonce_len + fname_len + channels_len + enc_len
+        raw = extract_bits_from_image(arr, min(total_bits, total_len * 8), 1, RGBChannel.ALL)
+        payload_type, is_compressed, bits_per_channel, salt, nonce, fname, channels_str, enc = parse_payload(raw)
         
-        # If all channels are used, use the ALL enum
-        if len(channels) == 3 and all(c in channels for c in [RGBChannel.RED, RGBChannel.GREEN, RGBChannel.BLUE]):
-            channels = RGBChannel.ALL
+        channels = _channels_from_str(channels_str)
         
         # Re-extract using the correct bits per channel and channels if needed
         if bits_per_channel > 1 or channels != RGBChannel.ALL:
-            # Calculate needed header size
-            total_len = len(MAGIC) + 1 + 4 + 4 + 1 + 1 + 2 + 2 + 2 + 1 + len(salt) + len(nonce) + len(fname.encode("utf-8")) + len(channels_str) + len(enc)
-            
-            # Re-extract with correct parameters
-            raw = extract_bits_from_image(stego_image, total_len * 8, bits_per_channel, channels)
+            raw = extract_bits_from_image(arr, total_len * 8, bits_per_channel, channels)
             payload_type, is_compressed, bits_per_channel, salt, nonce, fname, channels_str, enc = parse_payload(raw)
         
         # Attempt decrypt with password
@@ -361,24 +377,25 @@ class ImageStegoService:
         except Exception as exc:
             raise ValueError("Invalid password or corrupted payload") from exc
         
-        # Decompress if needed
-        try:
-            if is_compressed:
-                plain = decompress_data(plain, is_compressed)
-        except Exception as exc:
-            raise ValueError("Failed to decompress payload") from exc
-        
-        # Save the file
+        # Stream decompression straight to disk so the decompressed
+        # output never sits fully in memory next to the payload buffer
         output_dir.mkdir(parents=True, exist_ok=True)
         out_path = output_dir / (fname or "recovered.bin")
-        out_path.write_bytes(plain)
+        size_bytes = 0
+        try:
+            with open(out_path, "wb", buffering=1 << 20) as fh:
+                for chunk in decompress_stream(plain, is_compressed):
+                    size_bytes += len(chunk)
+                    fh.write(chunk)
+        except ValueError as exc:
+            raise ValueError("Failed to decompress payload") from exc
         
         # Build result
         channel_list = list(channels_str)
         return StegoRevealFileResult(
             output_path=out_path, 
             filename=out_path.name, 
-            size_bytes=len(plain),
+            size_bytes=size_bytes,
             was_compressed=is_compressed,
             channels_used=channel_list,
             bits_per_channel=bits_per_channel
@@ -3,10 +3,12 @@ Core steganography algorithms for LSB embedding and extraction
 """
 
 import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
 import numpy as np
 from PIL import Image
-from typing import Dict, List, Tuple, Union
-from pathlib import Path
 
 from ..models.stego_models import RGBChannel
 from .encryption import encrypt_if_needed, decrypt_if_needed
@@ -19,8 +21,38 @@ from ..utils.validation import validate_bits_per_channel, validate_channels
 MAGIC = b"STEG2"  # Updated magic for v2 with advanced features
 VERSION = 2
 
+# Compiled once; struct.pack/unpack with a format string re-parses the
+# format on every call, and unpack_from avoids slicing a copy of the
+# header bytes out of the extracted prefix
+_HDR = struct.Struct(">BIIBBHHHB")
+HEADER_SIZE = _HDR.size
+
+# Magic prefix as one integer so the header-parse hot path is a single
+# int compare with no allocation beyond the 5-byte slice
+_MAGIC_LEN = len(MAGIC)
+_MAGIC_INT = int.from_bytes(MAGIC, "big")
+
+
+# Precomputed enum-to-index tuples; capacity, embed and extract all
+# resolve channels on every call, so the lookup should be O(1) rather
+# than rebuilding a dict and sorting a list each time
+_CHANNEL_INDEX_MAP = {
+    RGBChannel.RED: (0,),
+    RGBChannel.GREEN: (1,),
+    RGBChannel.BLUE: (2,),
+    RGBChannel.ALL: (0, 1, 2),
+}
+
+
+@lru_cache(maxsize=64)
+def _indices_for_combination(channels: Tuple[RGBChannel, ...]) -> Tuple[int, ...]:
+    indices = set()
+    for ch in channels:
+        indices.update(_CHANNEL_INDEX_MAP.get(ch, ()))
+    return tuple(sorted(indices))
+
 
-def channel_to_indices(channel: Union[RGBChannel, List[RGBChannel]]) -> List[int]:
+def channel_to_indices(channel: Union[RGBChannel, List[RGBChannel]]) -> Tuple[int, ...]:
     """
     Convert channel specification to array indices (R=0, G=1, B=2)
     
@@ -28,22 +60,12 @@ def channel_to_indices(channel: Union[RGBChannel, List[RGBChannel]]) -> List[int
         channel: Channel or list of channels
         
     Returns:
-        List of channel indices
+        Tuple of channel indices
     """
-    channel_map = {
-        RGBChannel.RED: [0],
-        RGBChannel.GREEN: [1],
-        RGBChannel.BLUE: [2],
-        RGBChannel.ALL: [0, 1, 2]
-    }
-    
     if isinstance(channel, list):
-        indices = []
-        for ch in channel:
-            indices.extend(channel_map.get(ch, []))
-        return sorted(list(set(indices)))
+        return _indices_for_combination(tuple(channel))
     
-    return channel_map.get(channel, [0, 1, 2])
+    return _CHANNEL_INDEX_MAP.get(channel, (0, 1, 2))
 
 
 def calculate_capacity(
@@ -66,9 +88,9 @@ def calculate_capacity(
     validate_bits_per_channel(bits_per_channel)
     validate_channels(channels)
     
-    # Ensure image is in RGB mode
-    rgb = image.convert("RGB")
-    w, h = rgb.size
+    # Capacity depends only on dimensions, which conversion never
+    # changes — no need to materialize an RGB copy here at all
+    w, h = image.size
     
     # Get indices of channels to use
     channel_indices = channel_to_indices(channels)
@@ -87,70 +109,94 @@ def calculate_capacity(
     return total_bits, total_bits // 8, capacity_per_channel
 
 
-def embed_bits_into_image(
-    image: Image.Image, 
+def embed_bits_into_array(
+    arr: np.ndarray, 
     payload: bytes, 
     bits_per_channel: int, 
     channels: Union[RGBChannel, List[RGBChannel]]
-) -> Image.Image:
+) -> np.ndarray:
     """
-    Embed payload bits into image using specified bits per channel and channels
+    Embed payload bits in place into a writable (H, W, 3) uint8 array
+    
+    Callers that keep working in array space (e.g. feeding an encoder
+    directly) can use this to skip the PIL round-trip entirely;
+    embed_bits_into_image wraps it for PIL-based callers.
     
     Args:
-        image: Cover image
+        arr: Writable RGB pixel array, modified in place
         payload: Data to embed
         bits_per_channel: Number of bits per channel
         channels: Channels to use
         
     Returns:
-        Image with embedded data
+        The same array, with the payload embedded
     """
     # Validate inputs
     validate_bits_per_channel(bits_per_channel)
     validate_channels(channels)
-    
-    # Ensure image is in RGB mode
-    rgb = image.convert("RGB")
-    arr = np.array(rgb, dtype=np.uint8)
-    w, h, _ = arr.shape
-    
+
     # Determine which channels to use
     channel_indices = channel_to_indices(channels)
-    
-    # Convert payload to bits
+    nch = len(channel_indices)
+
+    # Unpack the payload to a bit stream and pad it out to whole pixel
+    # groups (nch * bits_per_channel bits per pixel); the pad bits only
+    # zero otherwise-unused LSBs in the final group
     payload_bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
-    total_bits_needed = len(payload_bits)
-    
-    # Create a flat view for each channel
-    channel_arrays = [arr[:, :, i].reshape(-1) for i in range(3)]
-    selected_channels = [channel_arrays[i] for i in channel_indices]
-    
-    # Create bit masks
-    mask = ((1 << bits_per_channel) - 1)
-    clear_mask = 0xFF ^ mask
-    
-    # Distribute bits across channels
-    bit_index = 0
-    for pixel_index in range(w * h):
-        if bit_index >= total_bits_needed:
-            break
-            
-        for ch_idx, channel in enumerate(selected_channels):
-            for bit_offset in range(bits_per_channel):
-                if bit_index >= total_bits_needed:
-                    break
-                    
-                # Clear bits and set with payload bit
-                current = channel[pixel_index] & clear_mask
-                bit_to_set = payload_bits[bit_index] << bit_offset
-                channel[pixel_index] = current | bit_to_set
-                bit_index += 1
+    group = nch * bits_per_channel
+    pad = (-len(payload_bits)) % group
+    if pad:
+        payload_bits = np.concatenate([payload_bits, np.zeros(pad, dtype=np.uint8)])
+
+    # Deposit each per-channel bit group into a byte in one C pass:
+    # little-endian packbits puts bit i at value i, exactly the shift-
+    # and-OR the embed layout needs, without the multiply/sum temporaries
+    grouped = payload_bits.reshape(-1, nch, bits_per_channel)
+    packed = np.packbits(grouped, axis=2, bitorder="little").reshape(-1, nch)
+
+    npix_used = packed.shape[0]
+    flat = arr.reshape(-1, 3)
+    if npix_used > flat.shape[0]:
+        raise ValueError("Payload exceeds image capacity")
+
+    # Clear the low bits of the used pixels and OR in the payload, one
+    # C-level pass per channel instead of a Python loop over pixels
+    clear_mask = np.uint8(0xFF ^ ((1 << bits_per_channel) - 1))
+    for k, idx in enumerate(channel_indices):
+        column = flat[:npix_used, idx]
+        flat[:npix_used, idx] = (column & clear_mask) | packed[:, k]
+
+    return arr
+
+
+def embed_bits_into_image(
+    image: Image.Image, 
+    payload: bytes, 
+    bits_per_channel: int, 
+    channels: Union[RGBChannel, List[RGBChannel]]
+) -> Image.Image:
+    """
+    Embed payload bits into image using specified bits per channel and channels
     
-    return Image.fromarray(arr, mode="RGB")
+    Args:
+        image: Cover image
+        payload: Data to embed
+        bits_per_channel: Number of bits per channel
+        channels: Channels to use
+        
+    Returns:
+        Image with embedded data
+    """
+    # np.array gives the writable copy the in-place bit surgery needs;
+    # skipping convert for images already in RGB avoids paying for two
+    # full-image copies
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    arr = np.array(rgb, dtype=np.uint8)
+    return Image.fromarray(embed_bits_into_array(arr, payload, bits_per_channel, channels), mode="RGB")
 
 
 def extract_bits_from_image(
-    image: Image.Image, 
+    image: "Image.Image | np.ndarray", 
     num_bits: int, 
     bits_per_channel: int, 
     channels: Union[RGBChannel, List[RGBChannel]]
@@ -159,7 +205,10 @@ def extract_bits_from_image(
     Extract bits from image using specified bits per channel and channels
     
     Args:
-        image: Image with embedded data
+        image: Image with embedded data, either a PIL image or an
+            already-converted (H, W, 3) uint8 array; passing the array
+            lets callers that extract twice (header then full payload)
+            pay for the RGB conversion only once
         num_bits: Number of bits to extract
         bits_per_channel: Number of bits per channel used
         channels: Channels used for embedding
@@ -170,49 +219,37 @@ def extract_bits_from_image(
     # Validate inputs
     validate_bits_per_channel(bits_per_channel)
     validate_channels(channels)
-    
-    # Ensure image is in RGB mode
-    rgb = image.convert("RGB")
-    arr = np.array(rgb, dtype=np.uint8)
-    w, h, _ = arr.shape
-    
+
+    # Ensure an RGB pixel array; extraction only reads, so asarray
+    # avoids copying the buffer when a PIL image is passed, and images
+    # already in RGB skip the conversion copy too
+    if isinstance(image, np.ndarray):
+        arr = image
+    else:
+        rgb = image if image.mode == "RGB" else image.convert("RGB")
+        arr = np.asarray(rgb, dtype=np.uint8)
+
     # Determine which channels to use
     channel_indices = channel_to_indices(channels)
-    
-    # Create a flat view for each channel
-    channel_arrays = [arr[:, :, i].reshape(-1) for i in range(3)]
-    selected_channels = [channel_arrays[i] for i in channel_indices]
-    
-    # Create bit masks for extraction
-    mask = ((1 << bits_per_channel) - 1)
-    
-    # Extract bits
-    bits_list = []
-    bit_index = 0
-    for pixel_index in range(w * h):
-        for ch_idx, channel in enumerate(selected_channels):
-            for bit_offset in range(bits_per_channel):
-                if bit_index >= num_bits:
-                    break
-                
-                # Extract the bit
-                bit = (channel[pixel_index] >> bit_offset) & 0x01
-                bits_list.append(bit)
-                bit_index += 1
-                
-            if bit_index >= num_bits:
-                break
-                
-        if bit_index >= num_bits:
-            break
-    
-    # Convert extracted bits to bytes
-    bit_array = np.array(bits_list, dtype=np.uint8)
+    nch = len(channel_indices)
+
+    # Only the pixel prefix holding num_bits is touched — a header read
+    # of a few KB no longer walks the whole image
+    group = nch * bits_per_channel
+    npix_needed = min(-(-num_bits // group), arr.shape[0] * arr.shape[1])
+    vals = arr.reshape(-1, 3)[:npix_needed][:, channel_indices]
+
+    # Expand each channel byte back into its low bits with the inverse
+    # little-endian unpack, mirroring the embed layout (pixel-major,
+    # then channel, then bit offset), and flatten
+    bits = np.unpackbits(vals[..., None], axis=2, count=bits_per_channel, bitorder="little")
+    bit_array = bits.reshape(-1)[:num_bits]
+
     # Pad to multiple of 8
     rem = (-len(bit_array)) % 8
     if rem:
         bit_array = np.concatenate([bit_array, np.zeros(rem, dtype=np.uint8)])
-    
+
     return np.packbits(bit_array).tobytes()
 
 
@@ -222,6 +259,7 @@ def build_payload(
     password: str | None, 
     filename: str | None,
     compress: bool = False,
+    compress_level: int = 6,
     error_correction_level: str = "none",
     bits_per_channel: int = 1,
     channels: Union[RGBChannel, List[RGBChannel]] = RGBChannel.ALL
@@ -235,6 +273,7 @@ def build_payload(
         password: Optional password for encryption
         filename: Optional filename for file payloads
         compress: Whether to compress data
+        compress_level: zlib compression level (1-9)
         error_correction_level: Error correction level
         bits_per_channel: Bits per channel used
         channels: Channels used
@@ -243,7 +282,7 @@ def build_payload(
         Tuple of (full_payload, is_compressed, compression_ratio)
     """
     # Compress if requested
-    compressed_data, is_compressed = compress_data(data, level=9)
+    compressed_data, is_compressed = compress_data(data, level=compress_level)
     compression_ratio = get_compression_ratio(len(data), len(compressed_data))
     
     # Add error correction if requested
@@ -251,8 +290,11 @@ def build_payload(
     ec_level = ErrorCorrectionLevel(error_correction_level)
     data_with_ec = add_error_correction(compressed_data, ec_level)
     
-    # Encrypt if password provided
+    # Encrypt if password provided. data_with_ec may be any bytes-like
+    # object; AES-GCM consumes it via the buffer protocol without a copy.
     enc, salt, nonce = encrypt_if_needed(data_with_ec, password)
+    if not isinstance(enc, bytes):
+        enc = bytes(enc)  # unencrypted pass-through needs real bytes to concatenate
     
     # Convert channel to a string representation for header
     channels_str = ""
@@ -266,8 +308,7 @@ def build_payload(
     fname_bytes = (filename or "").encode("utf-8")
     
     # Build header
-    header = MAGIC + struct.pack(
-        ">BIIBBHHHB",
+    header = MAGIC + _HDR.pack(
         VERSION,
         payload_type,
         len(enc),
@@ -285,6 +326,40 @@ def build_payload(
     return full_payload, is_compressed, compression_ratio
 
 
+def parse_header(raw: bytes) -> Tuple[int, bool, int, int, int, int, int, int]:
+    """
+    Parse only the fixed-size header fields from an extracted prefix
+    
+    Lets reveal read just (len(MAGIC) + HEADER_SIZE) bytes — 184 bits —
+    to learn every section length, then size its one full extraction
+    exactly instead of guessing with a fixed prefix.
+    
+    Args:
+        raw: At least the first len(MAGIC) + HEADER_SIZE extracted bytes
+        
+    Returns:
+        Tuple of (payload_type, is_compressed, bits_per_channel, enc_len,
+        salt_len, nonce_len, fname_len, channels_len)
+        
+    Raises:
+        ValueError: If header is invalid
+    """
+    if len(raw) < _MAGIC_LEN or int.from_bytes(raw[:_MAGIC_LEN], "big") != _MAGIC_INT:
+        raise ValueError(f"Invalid stego header: expected {MAGIC!r}")
+    
+    version, payload_type, enc_len, is_compressed, bits_per_channel, salt_len, nonce_len, fname_len, channels_len = _HDR.unpack_from(raw, _MAGIC_LEN)
+    return (
+        payload_type,
+        bool(is_compressed),
+        bits_per_channel,
+        enc_len,
+        salt_len,
+        nonce_len,
+        fname_len,
+        channels_len,
+    )
+
+
 def parse_payload(raw: bytes) -> Tuple[int, bool, int, bytes, bytes, str, str, bytes]:
     """
     Parse payload header and extract components
@@ -298,14 +373,12 @@ def parse_payload(raw: bytes) -> Tuple[int, bool, int, bytes, bytes, str, str, b
     Raises:
         ValueError: If header is invalid
     """
-    if not raw.startswith(MAGIC):
+    if len(raw) < _MAGIC_LEN or int.from_bytes(raw[:_MAGIC_LEN], "big") != _MAGIC_INT:
         raise ValueError(f"Invalid stego header: expected {MAGIC!r}")
     
-    off = len(MAGIC)
-    version, payload_type, enc_len, is_compressed, bits_per_channel, salt_len, nonce_len, fname_len, channels_len = struct.unpack(
-        ">BIIBBHHHB", raw[off : off + 1 + 4 + 4 + 1 + 1 + 2 + 2 + 2 + 1]
-    )
-    off += 1 + 4 + 4 + 1 + 1 + 2 + 2 + 2 + 1
+    off = _MAGIC_LEN
+    version, payload_type, enc_len, is_compressed, bits_per_channel, salt_len, nonce_len, fname_len, channels_len = _HDR.unpack_from(raw, off)
+    off += HEADER_SIZE
     
     # Read components
     salt = raw[off : off + salt_len]
@@ -2,19 +2,31 @@
 Bit plane visualization utilities for steganography analysis
 """
 
-import numpy as np
-from PIL import Image
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
+
+import numpy as np
+from PIL import Image
 from ..models.stego_models import BitPlaneVisualizerResult
 
 
-def extract_bit_plane(image: Image.Image, channel_idx: int, bit_plane: int) -> Image.Image:
+# Two-entry gather table mapping a bit to black or full white; a single
+# indexed load per pixel replaces the multiply pass
+_BIT_LUT = np.array([0, 255], dtype=np.uint8)
+
+
+def _extract_bit_plane_from_array(arr: np.ndarray, channel_idx: int, bit_plane: int) -> Image.Image:
     """
-    Extract a specific bit plane from the image
+    Extract a bit plane from an already-converted RGB pixel array
+    
+    The loops in generate_all_bit_planes and create_bit_plane_comparison
+    call this 8-24 times per request; taking the array lets them pay
+    for the PIL conversion once instead of per plane.
     
     Args:
-        image: Input PIL Image
+        arr: (H, W, 3) uint8 RGB pixel array
         channel_idx: Channel index (0=R, 1=G, 2=B)
         bit_plane: Bit plane to extract (0-7, where 0 is LSB)
         
@@ -24,21 +36,47 @@ def extract_bit_plane(image: Image.Image, channel_idx: int, bit_plane: int) -> I
     if bit_plane < 0 or bit_plane > 7:
         raise ValueError("Bit plane must be between 0 and 7")
     
-    # Ensure image is in RGB mode
-    rgb = image.convert("RGB")
-    arr = np.array(rgb)
-    
     # Extract the specified channel
     channel = arr[:, :, channel_idx]
     
-    # Extract the bit plane
-    bit_mask = 1 << bit_plane
-    bit_plane_data = ((channel & bit_mask) > 0).astype(np.uint8) * 255
+    # Extract the bit plane entirely in uint8: shift the plane down to
+    # bit 0 and gather through the 0/255 table — one pass, one output
+    # allocation, no bool intermediate.
+    bit_plane_data = _BIT_LUT[(channel >> np.uint8(bit_plane)) & np.uint8(1)]
     
     # Create a new image with the bit plane data
     return Image.fromarray(bit_plane_data, mode="L")
 
 
+def _save_all(jobs: "List[tuple[Image.Image, Path]]") -> None:
+    # Encode the independent outputs in parallel; each save releases
+    # the GIL for the zlib/filter work
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        list(pool.map(lambda job: job[0].save(job[1]), jobs))
+
+
+def _as_rgb_array(image: Image.Image) -> np.ndarray:
+    # Reads only, so skip the copy np.array would force (and the
+    # convert when already RGB)
+    rgb = image if image.mode == "RGB" else image.convert("RGB")
+    return np.asarray(rgb)
+
+
+def extract_bit_plane(image: Image.Image, channel_idx: int, bit_plane: int) -> Image.Image:
+    """
+    Extract a specific bit plane from the image
+    
+    Args:
+        image: Input PIL Image
+        channel_idx: Channel index (0=R, 1=G, 2=B)
+        bit_plane: Bit plane to extract (0-7, where 0 is LSB)
+        
+    Returns:
+        Grayscale image showing the bit plane
+    """
+    return _extract_bit_plane_from_array(_as_rgb_array(image), channel_idx, bit_plane)
+
+
 def generate_all_bit_planes(
     image: Image.Image, 
     channel: str, 
@@ -65,13 +103,16 @@ def generate_all_bit_planes(
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Generate bit plane images
-    output_paths = []
+    # Generate bit plane images; one conversion shared by all 8 planes.
+    # The PNG encodes are independent and release the GIL inside
+    # Pillow's C code, so a thread pool scales them across cores.
+    arr = _as_rgb_array(image)
+    jobs = []
     for bit in range(8):  # 8 bits per channel
-        bit_plane_img = extract_bit_plane(image, channel_idx, bit)
-        out_path = output_dir / f"bit_plane_{channel}_{bit}.png"
-        bit_plane_img.save(out_path)
-        output_paths.append(out_path)
+        bit_plane_img = _extract_bit_plane_from_array(arr, channel_idx, bit)
+        jobs.append((bit_plane_img, output_dir / f"bit_plane_{channel}_{bit}.png"))
+    _save_all(jobs)
+    output_paths = [path for _, path in jobs]
     
     return BitPlaneVisualizerResult(
         output_images=output_paths,
@@ -139,11 +180,15 @@ def create_bit_plane_comparison(
     output_dir.mkdir(parents=True, exist_ok=True)
     output_paths = []
     
-    for channel in ["R", "G", "B"]:
+    # One conversion shared by all 24 channel/plane combinations, with
+    # the PNG encodes fanned out across threads as above
+    arr = _as_rgb_array(image)
+    jobs = []
+    for channel_idx, channel in enumerate(["R", "G", "B"]):
         for bit in range(8):
-            bit_plane_img = extract_bit_plane(image, {"R": 0, "G": 1, "B": 2}[channel], bit)
-            out_path = output_dir / f"comparison_{channel}_bit_{bit}.png"
-            bit_plane_img.save(out_path)
-            output_paths.append(out_path)
+            bit_plane_img = _extract_bit_plane_from_array(arr, channel_idx, bit)
+            jobs.append((bit_plane_img, output_dir / f"comparison_{channel}_bit_{bit}.png"))
+    _save_all(jobs)
+    output_paths = [path for _, path in jobs]
     
     return output_paths
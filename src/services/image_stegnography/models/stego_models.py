@@ -42,6 +42,7 @@ class StegoOptions(BaseModel):
     channels: Union[RGBChannel, List[RGBChannel]] = Field(default=RGBChannel.ALL, description="RGB channels to use")
     error_correction: ErrorCorrectionLevel = Field(default=ErrorCorrectionLevel.NONE, description="Error correction level")
     compress: bool = Field(default=False, description="Whether to compress payload before embedding")
+    compress_level: int = Field(default=6, ge=1, le=9, description="zlib compression level (1-9); ignored when zstd is used")
 
 
 class StegoTextHideRequest(BaseModel):
@@ -4,16 +4,19 @@ Image utility functions for steganography operations
 
 import httpx
 from io import BytesIO
-from typing import Optional
+from typing import Optional, Union
 from PIL import Image
 
 
-def load_image_from_input(file: Optional[BytesIO] = None, url: Optional[str] = None) -> Image.Image:
+def load_image_from_input(
+    file: Optional[Union[BytesIO, bytes, memoryview]] = None,
+    url: Optional[str] = None,
+) -> Image.Image:
     """
-    Load an image from either a file object or URL
+    Load an image from a file object, raw bytes, or URL
     
     Args:
-        file: BytesIO object containing image data
+        file: File-like object, bytes or memoryview containing image data
         url: URL to fetch image from
         
     Returns:
@@ -23,12 +26,24 @@ def load_image_from_input(file: Optional[BytesIO] = None, url: Optional[str] = N
         ValueError: If neither file nor url is provided
     """
     if file is not None:
+        if isinstance(file, (bytes, bytearray, memoryview)):
+            # BytesIO over an existing buffer is a view, not a copy, so
+            # callers holding raw bytes skip the intermediate wrapper
+            file = BytesIO(file)
         return Image.open(file)
     if url is not None:
+        # Stream the response into a single buffer instead of letting
+        # httpx materialize resp.content first — client.get would hold
+        # the full body twice (response buffer + BytesIO copy) for the
+        # duration of the download
+        buf = BytesIO()
         with httpx.Client(timeout=30) as client:
-            resp = client.get(url)
-            resp.raise_for_status()
-            return Image.open(BytesIO(resp.content))
+            with client.stream("GET", url) as resp:
+                resp.raise_for_status()
+                for chunk in resp.iter_bytes(1 << 16):
+                    buf.write(chunk)
+        buf.seek(0)
+        return Image.open(buf)
     raise ValueError("Provide file or url")
 
 
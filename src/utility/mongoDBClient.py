@@ -1,7 +1,7 @@
 from pymongo import MongoClient
 from pymongo.collection import Collection
 from pymongo.database import Database
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from threading import Lock
 
 # mongoDBClient.py
@@ -10,17 +10,35 @@ class MongoDBClient:
     #     self.client: MongoClient = MongoClient(uri)
     #     self.db: Database = self.client[db_name]
 
-    _instance = None
+    # One shared client per (uri, db) pair. The old single-slot
+    # singleton silently handed the first instance to every caller,
+    # regardless of which uri/db they asked for, and funneled all
+    # traffic through one default-sized connection pool.
+    _instances: Dict[Tuple[str, str], "MongoDBClient"] = {}
     _lock = Lock()
 
     def __new__(cls, uri, db_name):
-        if cls._instance is None:
+        key = (uri, db_name)
+        instance = cls._instances.get(key)
+        if instance is None:
             with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super(MongoDBClient, cls).__new__(cls)
-                    cls._instance.client = MongoClient(uri)
-                    cls._instance.db = cls._instance.client[db_name]
-        return cls._instance
+                instance = cls._instances.get(key)
+                if instance is None:
+                    instance = super(MongoDBClient, cls).__new__(cls)
+                    # Larger pool for concurrent request handlers, warm
+                    # minimum so bursts skip connection setup, and wire
+                    # compression (zlib is always available; zstd/snappy
+                    # are used when their packages are installed)
+                    instance.client = MongoClient(
+                        uri,
+                        maxPoolSize=200,
+                        minPoolSize=10,
+                        retryWrites=True,
+                        compressors="zstd,snappy,zlib",
+                    )
+                    instance.db = instance.client[db_name]
+                    cls._instances[key] = instance
+        return instance
 
     def get_collection(self, collection_name: str) -> Collection:
         return self.db[collection_name]
@@ -31,18 +49,37 @@ class MongoDBClient:
         result = collection.insert_one(data)
         return str(result)
 
-    def insert_many(self, collection_name: str, data: List[Dict[str, Any]]) -> List[str]:
+    def insert_many(self, collection_name: str, data: List[Dict[str, Any]], ordered: bool = False) -> List[str]:
+        # Unordered by default: the server can parallelize the batch and
+        # one bad document (e.g. a duplicate key) no longer aborts the
+        # rest. Pass ordered=True when insertion order matters.
         collection = self.get_collection(collection_name)
-        result = collection.insert_many(data)
+        result = collection.insert_many(data, ordered=ordered)
         return [str(id) for id in result.inserted_ids]
 
+    def bulk_write(self, collection_name: str, operations: List[Any], ordered: bool = False):
+        # Batches mixed InsertOne/UpdateOne/DeleteOne operations into one
+        # round trip instead of a per-document call in a loop
+        collection = self.get_collection(collection_name)
+        return collection.bulk_write(operations, ordered=ordered)
+
     def find_one(self, collection_name: str, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         collection = self.get_collection(collection_name)
         return collection.find_one(query)
 
-    def find_many(self, collection_name: str, query: Dict[str, Any] = {}) -> List[Dict[str, Any]]:
+    def iter_find(self, collection_name: str, query: Dict[str, Any] = {}, projection: Optional[Dict[str, Any]] = None, batch_size: int = 1000):
+        # Lazy variant of find_many: yields documents as server batches
+        # arrive instead of materializing the whole result set, so large
+        # collections can be scanned in constant memory
+        collection = self.get_collection(collection_name)
+        yield from collection.find(query, projection, batch_size=batch_size)
+
+    def find_many(self, collection_name: str, query: Dict[str, Any] = {}, projection: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         collection = self.get_collection(collection_name)
-        return list(collection.find(query))
+        cursor = collection.find(query, projection, batch_size=min(limit or 1000, 1000))
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return list(cursor)
 
     def update_one(self, collection_name: str, query: Dict[str, Any], update: Dict[str, Any]) -> int:
         collection = self.get_collection(collection_name)